@@ -0,0 +1,29 @@
+"""Add service_incidents.idempotency_key for deduplicating Slack retries
+
+Revision ID: 0a5d7c2e9f64
+Revises: f2d6b8e4a017
+Create Date: 2024-08-13 15:20:51.774203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a5d7c2e9f64'
+down_revision: Union[str, None] = 'f2d6b8e4a017'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nullable, existing and imported incidents have no key and NULLs never conflict
+    op.add_column('service_incidents', sa.Column('idempotency_key', sa.String(100), nullable=True))
+    op.create_unique_constraint('service_incidents_idempotency_key_key', 'service_incidents', ['idempotency_key'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('service_incidents_idempotency_key_key', 'service_incidents', type_='unique')
+    op.drop_column('service_incidents', 'idempotency_key')
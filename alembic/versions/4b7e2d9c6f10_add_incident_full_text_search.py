@@ -0,0 +1,53 @@
+"""Add full-text search vector to service_incidents
+
+Revision ID: 4b7e2d9c6f10
+Revises: e7a3c9d15b48
+Create Date: 2024-08-02 11:27:36.904157
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2d9c6f10'
+down_revision: Union[str, None] = 'e7a3c9d15b48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # array_to_string is only STABLE, generated columns need IMMUTABLE expressions
+    op.execute(
+        """
+        CREATE FUNCTION incident_array_text(anyarray) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$ SELECT coalesce(array_to_string($1, ' '), '') $$
+        """
+    )
+    op.add_column(
+        'service_incidents',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(message_for_sp, '')), 'B') || "
+                "setweight(to_tsvector('english', incident_array_text(affected_products) || ' ' || incident_array_text(suspected_owning_team)), 'C')",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index('ix_service_incidents_search_vector', 'service_incidents', ['search_vector'], unique=False, postgresql_using='gin')
+    # The B-tree on description only served exact matches, search goes through the vector
+    op.drop_index('ix_service_incidents_description', table_name='service_incidents')
+
+
+def downgrade() -> None:
+    op.create_index('ix_service_incidents_description', 'service_incidents', ['description'], unique=False)
+    op.drop_index('ix_service_incidents_search_vector', table_name='service_incidents')
+    op.drop_column('service_incidents', 'search_vector')
+    op.execute("DROP FUNCTION incident_array_text(anyarray)")
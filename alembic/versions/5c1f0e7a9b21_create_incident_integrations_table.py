@@ -0,0 +1,39 @@
+"""create incident_integrations table
+
+Revision ID: 5c1f0e7a9b21
+Revises: 03b06c196980
+Create Date: 2024-07-22 10:14:02.481532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1f0e7a9b21'
+down_revision: Union[str, None] = '03b06c196980'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'incident_integrations',
+        sa.Column('id', sa.Integer, primary_key=True, nullable=False),
+        sa.Column('incident_id', sa.Integer, sa.ForeignKey('service_incidents.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('integration', sa.String(50), nullable=False),  # slack, opsgenie or jira
+        sa.Column('status', sa.String(50), nullable=False, server_default='pending'),
+        sa.Column('detail', sa.String(500), nullable=True),  # channel id, alert request id, issue key or error
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint('incident_id', 'integration', name='uq_incident_integrations_incident_integration'),
+    )
+    op.create_index(op.f('ix_incident_integrations_id'), 'incident_integrations', ['id'], unique=False)
+    op.create_index(op.f('ix_incident_integrations_incident_id'), 'incident_integrations', ['incident_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_incident_integrations_incident_id'), table_name='incident_integrations')
+    op.drop_index(op.f('ix_incident_integrations_id'), table_name='incident_integrations')
+    op.drop_table('incident_integrations')
@@ -0,0 +1,38 @@
+"""create incident_external_refs table
+
+Revision ID: 7e1b4a9c3d58
+Revises: 0a5d7c2e9f64
+Create Date: 2024-08-15 11:07:39.158840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e1b4a9c3d58'
+down_revision: Union[str, None] = '0a5d7c2e9f64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'incident_external_refs',
+        sa.Column('id', sa.Integer, primary_key=True, nullable=False),
+        sa.Column('incident_id', sa.Integer, sa.ForeignKey('service_incidents.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('system', sa.String(50), nullable=False),  # jira, opsgenie or slack
+        sa.Column('kind', sa.String(50), nullable=False),  # issue, alert, channel, incident_message, outages_message
+        sa.Column('external_id', sa.String(100), nullable=False),  # issue key, alert id, channel id or message ts
+        sa.Column('parent_id', sa.String(100), nullable=True),  # channel id of a message ts
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint('incident_id', 'system', 'kind', name='uq_incident_external_refs_incident_system_kind'),
+    )
+    op.create_index('ix_incident_external_refs_system_external_id', 'incident_external_refs', ['system', 'external_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_incident_external_refs_system_external_id', table_name='incident_external_refs')
+    op.drop_table('incident_external_refs')
@@ -0,0 +1,48 @@
+"""Add indexes for keyset paginated incident listing
+
+Revision ID: 8d2b4f6a1c3e
+Revises: 5c1f0e7a9b21
+Create Date: 2024-07-29 09:41:17.203914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2b4f6a1c3e'
+down_revision: Union[str, None] = '5c1f0e7a9b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # created_at is the pagination key, it can no longer be NULL
+    op.execute("UPDATE service_incidents SET created_at = start_time WHERE created_at IS NULL")
+    op.alter_column('service_incidents', 'created_at',
+               existing_type=sa.DateTime(),
+               nullable=False,
+               server_default=sa.func.now())
+
+    op.create_index('ix_service_incidents_created_at_id', 'service_incidents', ['created_at', 'id'], unique=False)
+    # Replaces the single column status index, status is its leading column
+    op.drop_index('ix_service_incidents_status', table_name='service_incidents')
+    op.create_index('ix_service_incidents_status_created_at_id', 'service_incidents', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_service_incidents_severity_created_at_id', 'service_incidents', ['severity', 'created_at', 'id'], unique=False)
+    op.create_index('ix_service_incidents_suspected_owning_team_gin', 'service_incidents', ['suspected_owning_team'], unique=False, postgresql_using='gin')
+    op.create_index('ix_service_incidents_affected_products_gin', 'service_incidents', ['affected_products'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_service_incidents_affected_products_gin', table_name='service_incidents')
+    op.drop_index('ix_service_incidents_suspected_owning_team_gin', table_name='service_incidents')
+    op.drop_index('ix_service_incidents_severity_created_at_id', table_name='service_incidents')
+    op.drop_index('ix_service_incidents_status_created_at_id', table_name='service_incidents')
+    op.create_index('ix_service_incidents_status', 'service_incidents', ['status'], unique=False)
+    op.drop_index('ix_service_incidents_created_at_id', table_name='service_incidents')
+    op.alter_column('service_incidents', 'created_at',
+               existing_type=sa.DateTime(),
+               nullable=True,
+               server_default=None)
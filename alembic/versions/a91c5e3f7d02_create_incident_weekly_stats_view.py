@@ -0,0 +1,61 @@
+"""create incident_weekly_stats materialized view
+
+Revision ID: a91c5e3f7d02
+Revises: 4b7e2d9c6f10
+Create Date: 2024-08-06 16:48:10.332871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91c5e3f7d02'
+down_revision: Union[str, None] = '4b7e2d9c6f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One row per week and dimension value: every incident counts once towards
+    # 'all', its severity, each distinct team and each distinct product
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW incident_weekly_stats AS
+        WITH base AS (
+            SELECT date_trunc('week', start_time) AS week,
+                   severity,
+                   affected_products,
+                   suspected_owning_team,
+                   p1_customer_affected,
+                   EXTRACT(EPOCH FROM (end_time - start_time)) AS resolution_seconds
+            FROM service_incidents
+        )
+        SELECT week, 'all'::text AS dimension, 'all'::text AS dimension_value,
+               count(*) AS incident_count,
+               count(*) FILTER (WHERE p1_customer_affected) AS p1_customer_affected_count,
+               sum(resolution_seconds) AS total_resolution_seconds
+        FROM base GROUP BY week
+        UNION ALL
+        SELECT week, 'severity', severity,
+               count(*), count(*) FILTER (WHERE p1_customer_affected), sum(resolution_seconds)
+        FROM base GROUP BY week, severity
+        UNION ALL
+        SELECT week, 'team', team,
+               count(*), count(*) FILTER (WHERE p1_customer_affected), sum(resolution_seconds)
+        FROM base CROSS JOIN LATERAL (SELECT DISTINCT unnest(base.suspected_owning_team) AS team) teams
+        GROUP BY week, team
+        UNION ALL
+        SELECT week, 'product', product,
+               count(*), count(*) FILTER (WHERE p1_customer_affected), sum(resolution_seconds)
+        FROM base CROSS JOIN LATERAL (SELECT DISTINCT unnest(base.affected_products) AS product) products
+        GROUP BY week, product
+        """
+    )
+    # Required by REFRESH MATERIALIZED VIEW CONCURRENTLY, and the lookup path of GET /incidents/stats
+    op.execute("CREATE UNIQUE INDEX ux_incident_weekly_stats_dimension_week ON incident_weekly_stats (dimension, dimension_value, week)")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW incident_weekly_stats")
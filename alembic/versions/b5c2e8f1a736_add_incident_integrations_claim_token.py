@@ -0,0 +1,26 @@
+"""Add incident_integrations.claim_token so stale delivery outcomes are dropped
+
+Revision ID: b5c2e8f1a736
+Revises: 7e1b4a9c3d58
+Create Date: 2024-08-19 14:12:05.630417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5c2e8f1a736'
+down_revision: Union[str, None] = '7e1b4a9c3d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('incident_integrations', sa.Column('claim_token', sa.String(32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('incident_integrations', 'claim_token')
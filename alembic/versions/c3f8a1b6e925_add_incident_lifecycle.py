@@ -0,0 +1,62 @@
+"""Add incident lifecycle: status constraint, incident_events, open incidents index
+
+Revision ID: c3f8a1b6e925
+Revises: a91c5e3f7d02
+Create Date: 2024-08-09 10:02:44.615093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a1b6e925'
+down_revision: Union[str, None] = 'a91c5e3f7d02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Nothing ever set status before, every existing incident starts out open
+    op.execute("UPDATE service_incidents SET status = 'open' WHERE status IS NULL")
+    op.alter_column('service_incidents', 'status',
+               existing_type=sa.String(50),
+               nullable=False,
+               server_default='open')
+    op.create_check_constraint(
+        'ck_service_incidents_status',
+        'service_incidents',
+        "status IN ('open', 'investigating', 'mitigated', 'resolved')",
+    )
+    op.create_index(
+        'ix_service_incidents_unresolved_created_at_id',
+        'service_incidents',
+        ['created_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status <> 'resolved'"),
+    )
+
+    op.create_table(
+        'incident_events',
+        sa.Column('id', sa.Integer, primary_key=True, nullable=False),
+        sa.Column('incident_id', sa.Integer, sa.ForeignKey('service_incidents.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('from_status', sa.String(50), nullable=True),
+        sa.Column('to_status', sa.String(50), nullable=False),
+        sa.Column('actor', sa.String(100), nullable=True),  # Slack user ID or API caller
+        sa.Column('source', sa.String(50), nullable=False, server_default='api'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_incident_events_incident_id_created_at', 'incident_events', ['incident_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_incident_events_incident_id_created_at', table_name='incident_events')
+    op.drop_table('incident_events')
+    op.drop_index('ix_service_incidents_unresolved_created_at_id', table_name='service_incidents')
+    op.drop_constraint('ck_service_incidents_status', 'service_incidents', type_='check')
+    op.alter_column('service_incidents', 'status',
+               existing_type=sa.String(50),
+               nullable=True,
+               server_default=None)
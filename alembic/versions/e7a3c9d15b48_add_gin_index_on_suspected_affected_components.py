@@ -0,0 +1,26 @@
+"""Add GIN index on suspected_affected_components
+
+Revision ID: e7a3c9d15b48
+Revises: 8d2b4f6a1c3e
+Create Date: 2024-07-30 14:05:52.718240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c9d15b48'
+down_revision: Union[str, None] = '8d2b4f6a1c3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # affected_products and suspected_owning_team got theirs in 8d2b4f6a1c3e
+    op.create_index('ix_service_incidents_suspected_affected_components_gin', 'service_incidents', ['suspected_affected_components'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_service_incidents_suspected_affected_components_gin', table_name='service_incidents')
@@ -0,0 +1,37 @@
+"""Turn incident_integrations into a delivery outbox: attempts, next_attempt_at
+
+Revision ID: f2d6b8e4a017
+Revises: c3f8a1b6e925
+Create Date: 2024-08-12 09:41:27.302118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d6b8e4a017'
+down_revision: Union[str, None] = 'c3f8a1b6e925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('incident_integrations', sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+    # Entries still pending from before the dispatcher existed become due right away
+    op.add_column('incident_integrations', sa.Column('next_attempt_at', sa.DateTime(), nullable=False, server_default=sa.func.now()))
+    op.create_index(
+        'ix_incident_integrations_pending_next_attempt_at',
+        'incident_integrations',
+        ['next_attempt_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_incident_integrations_pending_next_attempt_at', table_name='incident_integrations')
+    op.drop_column('incident_integrations', 'next_attempt_at')
+    op.drop_column('incident_integrations', 'attempts')
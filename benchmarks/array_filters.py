@@ -0,0 +1,105 @@
+"""Time @> and && filters on ARRAY columns with and without a GIN index.
+
+Builds a synthetic table shaped like service_incidents' array columns in the
+database configured in .env, runs the filters produced by crud.array_filter
+against it and drops the table afterwards.
+
+    python -m benchmarks.array_filters --rows 1000000
+"""
+import argparse
+import time
+from sqlalchemy import Column, Integer, MetaData, String, Table, func, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from src.crud import array_filter
+from src.database import engine
+
+metadata = MetaData()
+
+bench_incidents = Table(
+    "bench_incident_arrays",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("affected_products", ARRAY(String), nullable=False),
+    Column("suspected_owning_team", ARRAY(String), nullable=False),
+)
+
+# Plain DDL rather than Index() objects: an Index built from the table's columns
+# attaches to the table, and create_all would build it before the baseline run
+CREATE_GIN_INDEXES = [
+    text("CREATE INDEX ix_bench_incident_arrays_products_gin ON bench_incident_arrays USING gin (affected_products)"),
+    text("CREATE INDEX ix_bench_incident_arrays_teams_gin ON bench_incident_arrays USING gin (suspected_owning_team)"),
+]
+
+# Every row gets 1-3 of 60 products and 1-2 of 40 teams
+FILL = text(
+    """
+    INSERT INTO bench_incident_arrays (id, affected_products, suspected_owning_team)
+    SELECT g,
+           ARRAY(SELECT 'product-' || (floor(random() * 60))::int
+                 FROM generate_series(1, 1 + (g % 3))),
+           ARRAY(SELECT 'team-' || (floor(random() * 40))::int
+                 FROM generate_series(1, 1 + (g % 2)))
+    FROM generate_series(1, :rows) AS g
+    """
+)
+
+QUERIES = {
+    "product @> one": array_filter(bench_incidents.c.affected_products, ["product-7"], "all"),
+    "product @> two": array_filter(bench_incidents.c.affected_products, ["product-7", "product-8"], "all"),
+    "product && two": array_filter(bench_incidents.c.affected_products, ["product-7", "product-8"], "any"),
+    "team @> one": array_filter(bench_incidents.c.suspected_owning_team, ["team-3"], "all"),
+}
+
+
+def scan_type(connection, query) -> str:
+    """Scan nodes of the plan, so each run shows what it actually measured."""
+    compiled = query.compile(dialect=connection.dialect)
+    plan = connection.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).scalars().all()
+    return ", ".join(
+        line.strip().removeprefix("->").strip().split("  ")[0] for line in plan if "Scan" in line
+    )
+
+
+def run_queries(connection, label: str, repeat: int):
+    for name, condition in QUERIES.items():
+        query = select(func.count()).select_from(bench_incidents).where(condition)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            count = connection.execute(query).scalar_one()
+            timings.append(time.perf_counter() - started)
+        print(
+            f"{label:<10} {name:<16} rows={count:<8} best={min(timings) * 1000:.2f}ms "
+            f"plan={scan_type(connection, query)}"
+        )
+
+
+def main(rows: int, repeat: int):
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    try:
+        with engine.begin() as connection:
+            print(f"Loading {rows} rows")
+            connection.execute(FILL, {"rows": rows})
+            connection.execute(text("ANALYZE bench_incident_arrays"))
+
+        with engine.connect() as connection:
+            run_queries(connection, "seq scan", repeat)
+
+        with engine.begin() as connection:
+            for create_index in CREATE_GIN_INDEXES:
+                connection.execute(create_index)
+            connection.execute(text("ANALYZE bench_incident_arrays"))
+
+        with engine.connect() as connection:
+            run_queries(connection, "gin", repeat)
+    finally:
+        metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
@@ -0,0 +1,89 @@
+"""Compare the old add/commit/refresh incident insert with INSERT ... RETURNING.
+
+Runs against the database configured in .env and deletes the rows it created.
+
+    python -m benchmarks.incident_insert --count 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import delete
+from src import models
+from src import schemas
+from src.crud import insert_incident
+from src.database import AsyncSessionLocal, async_engine
+from src.helperFunctions.side_effects import INTEGRATIONS
+
+
+def sample_incident(i: int) -> schemas.IncidentCreate:
+    start = datetime.now() - timedelta(hours=1)
+    return schemas.IncidentCreate(
+        affected_products=["BetBuilder", "Telemetry"],
+        severity="P2",
+        suspected_owning_team=["Platform"],
+        start_time=start,
+        end_time=start + timedelta(minutes=30),
+        p1_customer_affected=False,
+        suspected_affected_components=["component_1"],
+        description=f"benchmark incident {i}",
+        message_for_sp=None,
+    )
+
+
+async def add_commit_refresh(incident: schemas.IncidentCreate) -> int:
+    async with AsyncSessionLocal() as db:
+        db_incident = models.Incident(**incident.dict())
+        db_incident.integrations = [
+            models.IncidentIntegration(integration=name, status="pending")
+            for name in INTEGRATIONS
+        ]
+        db.add(db_incident)
+        await db.commit()
+        await db.refresh(db_incident)
+        return db_incident.id
+
+
+async def insert_returning(incident: schemas.IncidentCreate) -> int:
+    async with AsyncSessionLocal() as db:
+        db_incident = await insert_incident(db, incident)
+        return db_incident.id
+
+
+async def measure(name: str, insert, count: int) -> list:
+    timings, ids = [], []
+    for i in range(count):
+        incident = sample_incident(i)
+        started = time.perf_counter()
+        ids.append(await insert(incident))
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    print(
+        f"{name:<20} n={count} mean={statistics.mean(timings) * 1000:.3f}ms "
+        f"p50={timings[len(timings) // 2] * 1000:.3f}ms "
+        f"p99={timings[int(len(timings) * 0.99) - 1] * 1000:.3f}ms"
+    )
+    return ids
+
+
+async def main(count: int):
+    ids = []
+    try:
+        # Warm up the pool so neither path pays for connecting
+        ids += await measure("warmup", insert_returning, 10)
+        ids += await measure("add/commit/refresh", add_commit_refresh, count)
+        ids += await measure("insert returning", insert_returning, count)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(models.Incident).where(models.Incident.id.in_(ids)))
+            await db.commit()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.count))
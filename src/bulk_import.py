@@ -0,0 +1,178 @@
+"""Bulk load incidents from NDJSON with Postgres COPY.
+
+Used by POST /incidents/import, and from the command line for migrating
+history from the old tracker:
+
+    python -m src.bulk_import incidents.ndjson --batch-size 5000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List, Tuple, Union
+import orjson
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import schemas
+from src.database import AsyncSessionLocal, async_engine
+from src.metrics import metrics
+from src.stats import stats_refresher
+
+IMPORT_COLUMNS = [
+    "affected_products",
+    "severity",
+    "suspected_owning_team",
+    "start_time",
+    "end_time",
+    "p1_customer_affected",
+    "suspected_affected_components",
+    "description",
+    "message_for_sp",
+    "statuspage_notification",
+    "separate_channel_creation",
+    "status",
+    "created_at",
+]
+
+# Stop collecting error details past this many, the count keeps going
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+        self.errors: List[dict] = []
+        self.started = time.perf_counter()
+
+    def reject(self, line: int, error: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    def as_dict(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.imported / elapsed, 1) if elapsed else None,
+        }
+
+
+def parse_line(line: bytes) -> tuple:
+    incident = schemas.IncidentImport.model_validate(orjson.loads(line))
+    record = incident.model_dump()
+    record["created_at"] = record["created_at"] or datetime.now()
+    # COPY does not apply column defaults to the columns it is given
+    record["status"] = record["status"] or "open"
+    return tuple(record[column] for column in IMPORT_COLUMNS)
+
+
+async def _lines(source: Union[AsyncIterator[bytes], Iterable[bytes]]) -> AsyncIterator[bytes]:
+    """Split a stream of byte chunks (or an iterable of lines) into lines."""
+    pending = b""
+    if hasattr(source, "__aiter__"):
+        async for chunk in source:
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield line
+    else:
+        for chunk in source:
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield line
+    if pending:
+        yield pending
+
+
+async def copy_batch(db: AsyncSession, batch: List[tuple]):
+    # COPY is not exposed by SQLAlchemy, go through the session's asyncpg connection
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        "service_incidents", records=batch, columns=IMPORT_COLUMNS
+    )
+
+
+async def import_incidents(
+    source: Union[AsyncIterator[bytes], Iterable[bytes]], batch_size: int = 1000
+) -> dict:
+    """Validate NDJSON incidents and COPY them into service_incidents.
+
+    Lines are validated against schemas.IncidentImport as they arrive; invalid
+    lines are reported with their line number and skipped. Valid rows are sent
+    with COPY in batches of `batch_size`, one transaction per batch, so a bad
+    batch does not undo the ones already loaded. A batch the database refuses
+    is split in halves and retried until the offending rows are isolated and
+    reported by line; the other rows of the batch are still loaded. No Slack, Opsgenie or Jira
+    side effects are triggered for imported incidents.
+    """
+    report = ImportReport()
+
+    async with AsyncSessionLocal() as db:
+
+        async def flush(batch: List[Tuple[int, tuple]]):
+            try:
+                await copy_batch(db, [record for _, record in batch])
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                if len(batch) == 1:
+                    report.reject(batch[0][0], str(e))
+                    return
+                # Split the batch until the rows the database refuses are
+                # isolated, the rest of it still gets loaded
+                middle = len(batch) // 2
+                await flush(batch[:middle])
+                await flush(batch[middle:])
+                return
+            report.imported += len(batch)
+            metrics.increment("incidents_imported", len(batch))
+            stats_refresher.mark_dirty()
+
+        batch: List[Tuple[int, tuple]] = []
+        line_number = 0
+        async for line in _lines(source):
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                record = parse_line(line)
+            except (orjson.JSONDecodeError, ValidationError) as e:
+                report.reject(line_number, str(e))
+                continue
+            batch.append((line_number, record))
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+    result = report.as_dict()
+    print(
+        f"Imported {result['imported']} incidents, rejected {result['rejected']} "
+        f"in {result['elapsed_seconds']}s ({result['rows_per_second']} rows/s)"
+    )
+    return result
+
+
+async def main(path: str, batch_size: int):
+    try:
+        with open(path, "rb") as f:
+            result = await import_incidents(f, batch_size=batch_size)
+        for error in result["errors"]:
+            print(f"line {error['line']}: {error['error']}")
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk load incidents from an NDJSON file.")
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.batch_size))
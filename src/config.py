@@ -1,3 +1,4 @@
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -11,6 +12,11 @@ class Settings(BaseSettings):
     database_password: str
     database_name : str
     database_username : str
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_timeout: float = 30.0
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
     secret_key : str
     algorithm : str
     access_token_expire_minutes : int
@@ -18,6 +24,42 @@ class Settings(BaseSettings):
     jira_api_key: str
     jira_email: str
     jira_server: str
+    slack_max_connections: int = 20
+    slack_max_concurrency: int = 10
+    slack_timeout_seconds: float = 10.0
+    slack_channel_ready_timeout_seconds: float = 10.0
+    slack_channel_cache_ttl_seconds: float = 300.0
+    stats_refresh_interval_seconds: float = 300.0
+    outbox_poll_interval_seconds: float = 5.0
+    outbox_batch_size: int = 20
+    outbox_max_attempts: int = 8
+    outbox_backoff_base_seconds: float = 5.0
+    outbox_backoff_max_seconds: float = 900.0
+    outbox_lease_seconds: float = 120.0
+    slack_idempotency_cache_size: int = 2048
+    slack_idempotency_ttl_seconds: float = 600.0
+    opsgenie_api_url: str = "https://api.opsgenie.com"
+    opsgenie_max_connections: int = 10
+    opsgenie_timeout_seconds: float = 10.0
+    jira_max_connections: int = 10
+    jira_timeout_seconds: float = 30.0
+    jira_connect_timeout_seconds: float = 5.0
+    jira_bulk_max_size: int = 50
+    jira_bulk_flush_interval_seconds: float = 0.5
+    jira_project_key: str = "SO"
+    jira_issue_type: str = "Service Outage"
+    # Incident attribute -> Jira field, by id or by its name on the create screen
+    jira_incident_fields: Dict[str, str] = {
+        "start_time": "customfield_12608",
+        "end_time": "customfield_12607",
+        "suspected_owning_team": "customfield_17273",
+        "affected_products": "customfield_17272",
+    }
+    jira_createmeta_ttl_seconds: float = 3600.0
+    jira_createmeta_min_refresh_seconds: float = 60.0
+    # Bearer token for the write endpoints of the incidents API, which are
+    # refused while it is unset
+    incidents_api_token: Optional[str] = None
     
     
     
@@ -0,0 +1,156 @@
+import base64
+from datetime import datetime
+from typing import List, Literal, Optional, Tuple
+import orjson
+from sqlalchemy import func, insert, select, text, tuple_
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import models
+from src import schemas
+from src.helperFunctions.side_effects import INTEGRATIONS
+from src.stats import stats_refresher
+
+
+async def insert_incident(
+    db: AsyncSession, incident: schemas.IncidentCreate, idempotency_key: Optional[str] = None
+) -> Optional[models.Incident]:
+    """Persist an incident with its pending outbox entries and commit.
+
+    The incident is written with INSERT ... RETURNING, so the id, created_at and
+    every other column come back from the insert itself instead of from a
+    separate SELECT after the commit (what db.refresh() used to cost).
+
+    With an idempotency_key the insert is ON CONFLICT DO NOTHING on its unique
+    constraint. None is returned when an incident with that key already exists,
+    nothing is written and no side effects are queued a second time.
+    """
+    statement = postgresql.insert(models.Incident).values(**incident.dict(), idempotency_key=idempotency_key)
+    if idempotency_key is not None:
+        statement = statement.on_conflict_do_nothing(index_elements=[models.Incident.idempotency_key])
+    db_incident = await db.scalar(statement.returning(models.Incident))
+    if db_incident is None:
+        await db.rollback()
+        return None
+
+    await db.execute(
+        insert(models.IncidentIntegration),
+        [
+            {"incident_id": db_incident.id, "integration": name, "status": "pending"}
+            for name in INTEGRATIONS
+        ],
+    )
+    await db.commit()
+    stats_refresher.mark_dirty()
+    return db_incident
+
+
+async def incident_id_for_key(db: AsyncSession, idempotency_key: str) -> Optional[int]:
+    return await db.scalar(
+        select(models.Incident.id).where(models.Incident.idempotency_key == idempotency_key)
+    )
+
+
+ArrayMatch = Literal["all", "any"]
+
+
+def array_filter(column, values: List[str], match: ArrayMatch = "all"):
+    """Filter an ARRAY(String) column with an operator its GIN index serves.
+
+    match="all" is containment (column @> values, every value present),
+    match="any" is overlap (column && values, at least one value present).
+    """
+    if match == "any":
+        return column.overlap(values)
+    return column.contains(values)
+
+
+def incident_filters(
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    teams: Optional[List[str]] = None,
+    products: Optional[List[str]] = None,
+    components: Optional[List[str]] = None,
+    match: ArrayMatch = "all",
+    unresolved: bool = False,
+) -> list:
+    """WHERE conditions shared by the listing and export queries."""
+    conditions = []
+    if unresolved:
+        # Same predicate as the partial index ix_service_incidents_unresolved_created_at_id,
+        # inlined: the planner cannot match a partial index against a bound parameter
+        conditions.append(text("service_incidents.status <> 'resolved'"))
+    if status is not None:
+        conditions.append(models.Incident.status == status)
+    if severity is not None:
+        conditions.append(models.Incident.severity == severity)
+    if teams:
+        conditions.append(array_filter(models.Incident.suspected_owning_team, teams, match))
+    if products:
+        conditions.append(array_filter(models.Incident.affected_products, products, match))
+    if components:
+        conditions.append(array_filter(models.Incident.suspected_affected_components, components, match))
+    return conditions
+
+
+def encode_cursor(incident: models.Incident) -> str:
+    raw = orjson.dumps([incident.created_at.isoformat(), incident.id])
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, incident_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(incident_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def list_incidents(
+    db: AsyncSession,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    teams: Optional[List[str]] = None,
+    products: Optional[List[str]] = None,
+    components: Optional[List[str]] = None,
+    match: ArrayMatch = "all",
+    unresolved: bool = False,
+) -> Tuple[List[models.Incident], Optional[str]]:
+    """Newest incidents first, keyset paginated on (created_at, id).
+
+    The cursor is the position of the last row of the previous page, so every
+    page is an index range scan no matter how deep the caller pages, unlike
+    OFFSET which reads and discards every skipped row.
+    """
+    query = select(models.Incident).where(
+        *incident_filters(status, severity, teams, products, components, match, unresolved)
+    )
+    if cursor is not None:
+        created_at, incident_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(models.Incident.created_at, models.Incident.id) < tuple_(created_at, incident_id)
+        )
+
+    # One extra row tells us whether there is a next page
+    query = query.order_by(models.Incident.created_at.desc(), models.Incident.id.desc()).limit(limit + 1)
+    incidents = list(await db.scalars(query))
+    next_cursor = encode_cursor(incidents[limit - 1]) if len(incidents) > limit else None
+    return incidents[:limit], next_cursor
+
+
+async def search_incidents(db: AsyncSession, q: str, limit: int = 20) -> List[Tuple[models.Incident, float]]:
+    """Incidents matching a web-search style query, most relevant first.
+
+    Matches against the generated search_vector column through its GIN index;
+    accepts quoted phrases, "or" and -exclusions.
+    """
+    query = func.websearch_to_tsquery("english", q)
+    rank = func.ts_rank_cd(models.Incident.search_vector, query).label("rank")
+    result = await db.execute(
+        select(models.Incident, rank)
+        .where(models.Incident.search_vector.op("@@")(query))
+        .order_by(rank.desc(), models.Incident.created_at.desc())
+        .limit(limit)
+    )
+    return list(result.tuples())
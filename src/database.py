@@ -1,16 +1,78 @@
+import time
 from sqlalchemy import create_engine 
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base 
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
+from .metrics import metrics
 
 
 SQLALCHEMY_DATABASE_URL =  f"postgresql+psycopg2://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
 
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
+
+
+class TimedCheckoutMixin:
+    """Records how long a checkout waited for a connection from the pool."""
+
+    metric_prefix = "db_pool"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.increment(f"{self.metric_prefix}_checkout_timeouts")
+            raise
+        finally:
+            metrics.observe(f"{self.metric_prefix}_checkout_wait_seconds", time.perf_counter() - started)
+
+
+class TimedQueuePool(TimedCheckoutMixin, QueuePool):
+    metric_prefix = "db_pool"
+
+
+class TimedAsyncQueuePool(TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    metric_prefix = "db_async_pool"
+
+
+# Both engines share the pool settings, size them for incident storms via the environment
+pool_options = {
+    "pool_size": settings.database_pool_size,
+    "max_overflow": settings.database_max_overflow,
+    "pool_timeout": settings.database_pool_timeout,
+    "pool_recycle": settings.database_pool_recycle,
+    "pool_pre_ping": settings.database_pool_pre_ping,
+}
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=TimedQueuePool, **pool_options)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# asyncpg engine for the request paths running on the event loop. Objects stay
+# readable after commit, there is no lazy reload on a closed async session.
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=TimedAsyncQueuePool, **pool_options)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def register_pool_gauges(prefix: str, get_pool):
+    # The pool is looked up on every read, engine.dispose() swaps in a new one
+    metrics.register_gauge(f"{prefix}_size", lambda: get_pool().size())
+    metrics.register_gauge(f"{prefix}_checked_out", lambda: get_pool().checkedout())
+    metrics.register_gauge(f"{prefix}_checked_in", lambda: get_pool().checkedin())
+    # overflow() counts down from -pool_size while the base pool is not full
+    metrics.register_gauge(f"{prefix}_overflow", lambda: max(get_pool().overflow(), 0))
+
+
+register_pool_gauges("db_pool", lambda: engine.pool)
+register_pool_gauges("db_async_pool", lambda: async_engine.sync_engine.pool)
+
+
 Base = declarative_base()
 
 def get_db():
@@ -18,4 +80,9 @@ def get_db():
         db = SessionLocal()
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
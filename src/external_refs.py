@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import models
+from src.database import AsyncSessionLocal
+
+ExternalRef = models.IncidentExternalRef
+
+
+async def save_refs(incident_id: int, system: str, refs: Dict[str, tuple]):
+    """Upsert the references of one system, refs maps kind -> (external_id, parent_id).
+
+    Uses its own session: it runs from outbox deliveries, after the incident
+    transaction is long committed. A redelivery overwrites the same rows.
+    """
+    statement = postgresql.insert(ExternalRef).values(
+        [
+            {
+                "incident_id": incident_id,
+                "system": system,
+                "kind": kind,
+                "external_id": external_id,
+                "parent_id": parent_id,
+                "updated_at": datetime.now(),
+            }
+            for kind, (external_id, parent_id) in refs.items()
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        constraint="uq_incident_external_refs_incident_system_kind",
+        set_={
+            "external_id": statement.excluded.external_id,
+            "parent_id": statement.excluded.parent_id,
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+    async with AsyncSessionLocal() as db:
+        await db.execute(statement)
+        await db.commit()
+
+
+async def get_ref(db: AsyncSession, incident_id: int, system: str, kind: str) -> Optional[models.IncidentExternalRef]:
+    return await db.scalar(
+        select(ExternalRef).where(
+            ExternalRef.incident_id == incident_id,
+            ExternalRef.system == system,
+            ExternalRef.kind == kind,
+        )
+    )
+
+
+async def list_refs(db: AsyncSession, incident_id: int) -> List[models.IncidentExternalRef]:
+    return list(
+        await db.scalars(
+            select(ExternalRef)
+            .where(ExternalRef.incident_id == incident_id)
+            .order_by(ExternalRef.system, ExternalRef.kind)
+        )
+    )
+
+
+async def find_refs(db: AsyncSession, system: str, external_id: str) -> List[models.IncidentExternalRef]:
+    """References with this id in `system`, e.g. the incident of Jira issue SO-123."""
+    return list(
+        await db.scalars(
+            select(ExternalRef).where(ExternalRef.system == system, ExternalRef.external_id == external_id)
+        )
+    )
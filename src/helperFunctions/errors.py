@@ -0,0 +1,6 @@
+class PermanentDeliveryError(Exception):
+    """A delivery that would fail the same way on every retry.
+
+    The outbox marks the entry failed on the first attempt instead of retrying
+    it up to outbox_max_attempts.
+    """
@@ -0,0 +1,74 @@
+import asyncio
+import httpx
+
+
+class AsyncApiClient:
+    """Connection handling shared by the Slack, Opsgenie and Jira clients.
+
+    One httpx.AsyncClient per API, created on first use (and again after
+    aclose()), keeps pooled keep-alive connections and sends the auth headers
+    set once here. A semaphore bounds the requests in flight, and rate limited
+    requests are retried after the Retry-After the API asks for. Subclasses
+    add the API's methods and turn responses into data or their own error.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: dict,
+        timeout: httpx.Timeout,
+        max_connections: int = 10,
+        max_concurrency: int = None,
+        max_retries: int = 3,
+        http2: bool = False,
+    ):
+        self._base_url = base_url
+        self._headers = headers
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=30.0,
+        )
+        self._timeout = timeout
+        self._http2 = http2
+        self._semaphore = asyncio.Semaphore(max_concurrency or max_connections)
+        self._max_retries = max_retries
+        self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self._base_url,
+                http2=self._http2,
+                limits=self._limits,
+                timeout=self._timeout,
+                headers=self._headers,
+            )
+        return self._client
+
+    def _transport_error(self, path: str, error: httpx.HTTPError) -> Exception:
+        """The API's own error for a request that got no response."""
+        raise NotImplementedError
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Pause before retrying a 429 that came without Retry-After."""
+        return 2 ** attempt
+
+    async def _send(self, method: str, path: str, **kwargs) -> httpx.Response:
+        client = self._get_client()
+        for attempt in range(self._max_retries + 1):
+            try:
+                async with self._semaphore:
+                    response = await client.request(method, path, **kwargs)
+            except httpx.HTTPError as e:
+                raise self._transport_error(path, e)
+
+            if response.status_code == 429 and attempt < self._max_retries:
+                await asyncio.sleep(float(response.headers.get("Retry-After", self._retry_delay(attempt))))
+                continue
+            return response
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -1,109 +1,197 @@
+import asyncio
 import base64
-import json
-import requests
-from fastapi import HTTPException, status
+import logging
+from typing import List, Optional, Tuple
+import httpx
 from src.config import settings
+from src.helperFunctions.http_client import AsyncApiClient
+from src.metrics import metrics
 from src.models import Incident
+from src.helperFunctions.jira_fields import JiraFieldCache
 
+logger = logging.getLogger(__name__)
 
-def get_jira_auth():
-    auth_str = f"{settings.jira_email}:{settings.jira_api_key}"
-    base_64_auth = base64.b64encode(auth_str.encode()).decode()
-    return base_64_auth
-
-
-def create_jira_ticket(incident: dict):
-    jira_url = f"{settings.jira_server}/rest/api/2/issue"
-    base_64_auth = get_jira_auth()
-    headers = {
-        "Authorization": f"Basic {base_64_auth}",
-        "Content-Type": "application/json",
-    }
-
-    # Convert times to ISO format, if they are not None
-    start_time_iso = incident.start_time.isoformat() if incident.start_time else None
-    end_time_iso = incident.end_time.isoformat() if incident.end_time else None
-
-    suspected_owning_team = [team for team in incident.suspected_owning_team]
-    affected_products = [product for product in incident.affected_products]
-    suspected_affected_components = [
-        component for component in incident.suspected_affected_components
-    ]
-
-    # Ensure fields are lists
-    incident.suspected_owning_team = [incident.suspected_owning_team] if isinstance(incident.suspected_owning_team, str) else incident.suspected_owning_team
-    incident.affected_products = [incident.affected_products] if isinstance(incident.affected_products, str) else incident.affected_products
-    incident.suspected_affected_components = [incident.suspected_affected_components] if isinstance(incident.suspected_affected_components, str) else incident.suspected_affected_components
-
-    #  # Ensuring that the correct format for multi-option fields
-    # print(f"Suspected Owning Team: {incident.suspected_owning_team}")
-    # print(f"Affected Products: {incident.affected_products}")
-    # print(f"Suspected Affected Components: {incident.suspected_affected_components}")
-
-    # Version # 2.0.0 - 2023-06-13
-
-    # incident['suspected_owning_team'] = [incident['suspected_owning_team']] if isinstance(incident['suspected_owning_team'], str) else incident['suspected_owning_team']
-    # incident['affected_products'] = [incident['affected_products']] if isinstance(incident['affected_products'], str) else incident['affected_products']
-    # incident['suspected_affected_components'] = [incident['suspected_affected_components']] if isinstance(incident['suspected_affected_components'], str) else incident['suspected_affected_components']
-
-    #  # Ensuring that the correct format for multi-option fields
-    # print(f"Suspected Owning Team: {incident['suspected_owning_team']}")
-    # print(f"Affected Products: {incident['affected_products']}")
-    # print(f"Suspected Affected Components: {incident['suspected_affected_components']}")
-
-    issue_dict = {
-        "fields": {
-            "project": {"key": "SO"},
-            "summary": f"Incident: {', '.join(affected_products)} - {incident.description}",
-            "description": (
-                f"Description: {incident.description}\n"
-                f"Severity: {incident.severity}\n"
-                f"Affected Products: {', '.join(affected_products)}\n"
-                f"Suspected Owning Team: {', '.join(suspected_owning_team)}\n"
-                f"Start Time: {incident.start_time.isoformat()}\n"
-                f"End Time: {incident.end_time.isoformat()}\n"
-                f"Customer Affected: {'Yes' if incident.p1_customer_affected else 'No'}\n"
-                f"Suspected Affected Components: {', '.join(suspected_affected_components)}\n"
-                f"Message for SP: {incident.message_for_sp or 'N/A'}\n"
-                f"Status Page Notification: {'Yes' if incident.statuspage_notification else 'No'}\n"
-                f"Separate Channel Creation: {'Yes' if incident.separate_channel_creation else 'No'}"
-            ),
-            "issuetype": {"name": "Service Outage"},
-            "reporter": {"name": settings.jira_email},
-            
-            # Custom fields
-            "customfield_12608": start_time_iso,
-            "customfield_12607": end_time_iso,
-            "customfield_17273": [{"value": team} for team in suspected_owning_team],
-            "customfield_17272": [{"value": product} for product in affected_products],
-        }
-    }
-
-    # Print for debugging
-    print(
-        f"Jira Payload - Affected Products: {issue_dict['fields']['customfield_17272']}"
-    )
-    print(
-        f"Jira Payload - Suspected Owning Team: {issue_dict['fields']['customfield_17273']}"
-    )
-    print("Sending request to Jira API")
-    print(f"URL: {jira_url}")
-    print(f"Headers: {headers}")
-    print(f"Payload: {json.dumps(issue_dict, indent=2)}")
-
-    try:
-        response = requests.post(jira_url, headers=headers, json=issue_dict)
-        print(f"Response status code: {response.status_code}")
-        print(f"Response content: {response.content.decode()}")
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        issue = response.json()
-        return issue
-    except requests.exceptions.HTTPError as http_err:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Jira API error: {response.text}",
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+
+class JiraApiError(Exception):
+    def __init__(self, path: str, status_code: Optional[int], response: dict):
+        self.path = path
+        self.status_code = status_code
+        self.response = response
+        super().__init__(f"Jira API error calling {path}: {status_code} {response}")
+
+
+def basic_auth_header(email: str, api_key: str) -> str:
+    return "Basic " + base64.b64encode(f"{email}:{api_key}".encode()).decode()
+
+
+class AsyncJiraClient(AsyncApiClient):
+    """Non-blocking Jira REST API client.
+
+    The Basic auth header is encoded once when the client is created. Request
+    and response bodies are logged at DEBUG only, headers never are since
+    they carry the API key.
+    """
+
+    def __init__(
+        self,
+        server: str,
+        email: str,
+        api_key: str,
+        max_connections: int = 10,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        max_retries: int = 3,
+    ):
+        super().__init__(
+            server,
+            {"Authorization": basic_auth_header(email, api_key)},
+            httpx.Timeout(timeout, connect=connect_timeout),
+            max_connections=max_connections,
+            max_retries=max_retries,
         )
+
+    def _transport_error(self, path: str, error: httpx.HTTPError) -> Exception:
+        return JiraApiError(path, None, {"errorMessages": [f"http_error: {error}"]})
+
+    async def request(self, method: str, path: str, json: dict = None, params: dict = None) -> dict:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Jira request %s %s params=%s body=%s", method, path, params, json)
+        response = await self._send(method, path, json=json, params=params)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Jira response %s %s status=%s body=%s", method, path, response.status_code, response.text)
+        data = response.json() if response.content else {}
+        if response.status_code >= 400:
+            raise JiraApiError(path, response.status_code, data)
+        return data
+
+    async def create_issue(self, payload: dict) -> dict:
+        return await self.request("POST", "/rest/api/2/issue", json=payload)
+
+    async def create_issues(self, payloads: List[dict]) -> dict:
+        """POST /rest/api/2/issue/bulk, at most JIRA_BULK_LIMIT issues per call."""
+        return await self.request("POST", "/rest/api/2/issue/bulk", json={"issueUpdates": payloads})
+
+
+# Jira rejects bulk requests with more issues than this
+JIRA_BULK_LIMIT = 50
+
+
+def bulk_results(count: int, response: dict) -> List[Tuple[Optional[dict], Optional[dict]]]:
+    """Pair each element of a bulk create request with its (issue, error).
+
+    Jira lists the created issues in request order without saying which
+    element they belong to, and the errors by failedElementNumber. Walking the
+    elements in order and skipping the failed ones lines the issues up.
+    """
+    errors = {error["failedElementNumber"]: error for error in response.get("errors", [])}
+    issues = iter(response.get("issues", []))
+    return [(None, errors[i]) if i in errors else (next(issues, None), None) for i in range(count)]
+
+
+class JiraIssueBatcher:
+    """Coalesces concurrent ticket creations into Jira bulk create calls.
+
+    create_issue() queues the incident and waits for its own issue. A batch is
+    sent when it reaches max_size or flush_interval after its first incident
+    was queued, whichever comes first: a longer interval means fewer calls
+    during an incident storm, at the price of that much latency on a quiet
+    day. A batch of one goes through the regular create endpoint.
+    """
+
+    def __init__(
+        self,
+        client: AsyncJiraClient,
+        fields: JiraFieldCache,
+        max_size: int = JIRA_BULK_LIMIT,
+        flush_interval: float = 0.5,
+    ):
+        self._client = client
+        self._fields = fields
+        self._max_size = min(max_size, JIRA_BULK_LIMIT)
+        self._flush_interval = flush_interval
+        self._pending: List[Tuple[int, dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._flushes = set()
+
+    async def create_issue(self, incident: Incident) -> dict:
+        # Raises InvalidFieldValue before anything is queued
+        payload = await self._fields.render(incident)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((incident.id, payload, future))
+        if len(self._pending) >= self._max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self._flush_interval)
+        self._timer = None
+        self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            # Keep a reference, the event loop only holds tasks weakly
+            task = asyncio.create_task(self._send(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _send(self, batch: List[Tuple[int, dict, asyncio.Future]]):
+        metrics.observe("jira_batch_size", len(batch))
+        try:
+            if len(batch) == 1:
+                results = [(await self._client.create_issue(batch[0][1]), None)]
+            else:
+                response = await self._client.create_issues([payload for _, payload, _ in batch])
+                results = bulk_results(len(batch), response)
+        except Exception as e:
+            results = [(None, e)] * len(batch)
+
+        for (incident_id, _, future), (issue, error) in zip(batch, results):
+            if future.done():
+                continue
+            if issue is not None:
+                logger.info("Jira issue %s created for incident %s", issue.get("key"), incident_id)
+                future.set_result(issue)
+            elif isinstance(error, Exception):
+                future.set_exception(error)
+            else:
+                future.set_exception(
+                    JiraApiError("/rest/api/2/issue/bulk", (error or {}).get("status"), (error or {}).get("elementErrors", {}))
+                )
+
+    async def aclose(self):
+        self._flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+jira_client = AsyncJiraClient(
+    settings.jira_server,
+    settings.jira_email,
+    settings.jira_api_key,
+    max_connections=settings.jira_max_connections,
+    timeout=settings.jira_timeout_seconds,
+    connect_timeout=settings.jira_connect_timeout_seconds,
+)
+
+jira_fields = JiraFieldCache(
+    jira_client,
+    project_key=settings.jira_project_key,
+    issue_type=settings.jira_issue_type,
+    reporter=settings.jira_email,
+    mapping=settings.jira_incident_fields,
+    ttl=settings.jira_createmeta_ttl_seconds,
+    min_refresh_interval=settings.jira_createmeta_min_refresh_seconds,
+)
+
+jira_batcher = JiraIssueBatcher(
+    jira_client,
+    jira_fields,
+    max_size=settings.jira_bulk_max_size,
+    flush_interval=settings.jira_bulk_flush_interval_seconds,
+)
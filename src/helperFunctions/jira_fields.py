@@ -0,0 +1,182 @@
+"""Jira create-screen metadata and the issue payload built from it.
+
+Which custom field holds what, and which option values a select field
+accepts, is read from Jira's createmeta for the configured project and issue
+type instead of being hardcoded. The metadata is compiled into an
+IssueTemplate once per refresh, so building a payload per incident is only a
+fill-in of precomputed field ids and formatters.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+from src.helperFunctions.errors import PermanentDeliveryError
+from src.models import Incident
+
+
+class InvalidFieldValue(PermanentDeliveryError, ValueError):
+    """An incident value Jira would reject, caught before sending the issue."""
+
+
+def _as_list(value) -> list:
+    return value if isinstance(value, list) else [value]
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+# Formatter for an incident attribute, by the schema of the Jira field it goes to
+def field_formatter(schema: dict) -> Callable:
+    field_type, items = schema.get("type"), schema.get("items")
+    if field_type == "array" and items == "option":
+        return lambda value: [{"value": item} for item in _as_list(value)]
+    if field_type == "array":
+        return _as_list
+    if field_type == "option":
+        return lambda value: {"value": _as_list(value)[0]}
+    if field_type == "date":
+        return lambda value: value.date().isoformat() if isinstance(value, datetime) else value
+    if field_type == "datetime":
+        return _iso
+    if field_type == "string":
+        return lambda value: ", ".join(value) if isinstance(value, list) else value
+    return _iso
+
+
+def allowed_values(meta: dict) -> Optional[FrozenSet[str]]:
+    values = meta.get("allowedValues")
+    if not values:
+        return None
+    return frozenset(value["value"] for value in values if "value" in value)
+
+
+class IssueTemplate:
+    """Payload of one project and issue type, compiled from createmeta."""
+
+    def __init__(self, project_key: str, issue_type: str, reporter: str, fields: Dict[str, dict], mapping: Dict[str, str]):
+        self.project_key = project_key
+        self.issue_type = issue_type
+        self.static_fields = {
+            "project": {"key": project_key},
+            "issuetype": {"name": issue_type},
+            "reporter": {"name": reporter},
+        }
+        by_name = {meta.get("name", "").lower(): field_id for field_id, meta in fields.items()}
+
+        # (incident attribute, field id, formatter, allowed option values)
+        self.dynamic_fields: List[Tuple[str, str, Callable, Optional[FrozenSet[str]]]] = []
+        self.missing_fields: List[str] = []
+        for attribute, field in mapping.items():
+            # Configured by id (customfield_12608) or by the name shown in Jira
+            field_id = field if field in fields else by_name.get(field.lower())
+            if field_id is None:
+                self.missing_fields.append(field)
+                continue
+            meta = fields[field_id]
+            self.dynamic_fields.append(
+                (attribute, field_id, field_formatter(meta.get("schema", {})), allowed_values(meta))
+            )
+
+    def render(self, incident: Incident) -> dict:
+        affected_products = ", ".join(incident.affected_products)
+        payload = {
+            **self.static_fields,
+            "summary": f"Incident: {affected_products} - {incident.description}",
+            "description": (
+                f"Description: {incident.description}\n"
+                f"Severity: {incident.severity}\n"
+                f"Affected Products: {affected_products}\n"
+                f"Suspected Owning Team: {', '.join(incident.suspected_owning_team)}\n"
+                f"Start Time: {incident.start_time.isoformat()}\n"
+                f"End Time: {incident.end_time.isoformat()}\n"
+                f"Customer Affected: {'Yes' if incident.p1_customer_affected else 'No'}\n"
+                f"Suspected Affected Components: {', '.join(incident.suspected_affected_components)}\n"
+                f"Message for SP: {incident.message_for_sp or 'N/A'}\n"
+                f"Status Page Notification: {'Yes' if incident.statuspage_notification else 'No'}\n"
+                f"Separate Channel Creation: {'Yes' if incident.separate_channel_creation else 'No'}"
+            ),
+        }
+        for attribute, field_id, formatter, allowed in self.dynamic_fields:
+            value = getattr(incident, attribute)
+            if allowed is not None:
+                rejected = [item for item in _as_list(value) if item not in allowed]
+                if rejected:
+                    raise InvalidFieldValue(
+                        f"{attribute} values {rejected} are not options of Jira field {field_id}"
+                    )
+            payload[field_id] = formatter(value)
+        return {"fields": payload}
+
+
+class JiraFieldCache:
+    """createmeta of the incident project and issue type, refreshed on a TTL.
+
+    A value rejected by the cached options triggers one early refresh (an
+    option may just have been added in Jira), at most once per
+    min_refresh_interval so a bad value cannot hammer createmeta.
+    """
+
+    def __init__(
+        self,
+        client,
+        project_key: str,
+        issue_type: str,
+        reporter: str,
+        mapping: Dict[str, str],
+        ttl: float = 3600.0,
+        min_refresh_interval: float = 60.0,
+    ):
+        self._client = client
+        self._project_key = project_key
+        self._issue_type = issue_type
+        self._reporter = reporter
+        self._mapping = mapping
+        self._ttl = ttl
+        self._min_refresh_interval = min_refresh_interval
+        self._template: Optional[IssueTemplate] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def fetch_fields(self) -> Dict[str, dict]:
+        data = await self._client.request(
+            "GET",
+            "/rest/api/2/issue/createmeta",
+            params={
+                "projectKeys": self._project_key,
+                "issuetypeNames": self._issue_type,
+                "expand": "projects.issuetypes.fields",
+            },
+        )
+        for project in data.get("projects", []):
+            for issue_type in project.get("issuetypes", []):
+                if issue_type.get("name") == self._issue_type:
+                    return issue_type.get("fields", {})
+        raise LookupError(f"Jira issue type {self._issue_type} not found in project {self._project_key}")
+
+    async def template(self, force: bool = False) -> IssueTemplate:
+        if not force and self._template is not None and time.monotonic() - self._loaded_at < self._ttl:
+            return self._template
+        async with self._lock:
+            # Someone else may have refreshed while we waited for the lock
+            if self._template is not None and time.monotonic() - self._loaded_at < (
+                self._min_refresh_interval if force else self._ttl
+            ):
+                return self._template
+            template = IssueTemplate(
+                self._project_key, self._issue_type, self._reporter, await self.fetch_fields(), self._mapping
+            )
+            if template.missing_fields:
+                print(f"Jira fields not on the create screen, left out: {template.missing_fields}")
+            self._template, self._loaded_at = template, time.monotonic()
+            return template
+
+    async def render(self, incident: Incident) -> dict:
+        template = await self.template()
+        try:
+            return template.render(incident)
+        except InvalidFieldValue:
+            refreshed = await self.template(force=True)
+            if refreshed is template:
+                raise
+            return refreshed.render(incident)
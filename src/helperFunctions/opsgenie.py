@@ -1,20 +1,148 @@
-import requests
+import asyncio
+from typing import Optional
+import httpx
 from src.config import settings
+from src.helperFunctions.http_client import AsyncApiClient
+from src.models import Incident
 
-async def create_alert(incident):
-    url = "https://api.opsgenie.com/v2/alerts"
-    headers = {
-        "Authorization": f"GenieKey {settings.opsgenie_api_key}",
-        "Content-Type": "application/json",
-    }
-    
-    payload = {
-        "message": "Incident Alert",
-        "description": f"An incident has been created with the following details: \n{incident}",
-        "priority": "P1",
+# Severity picked in the incident form -> Opsgenie priority. Anything customer
+# affecting pages as P1 whatever severity was picked.
+SEVERITY_PRIORITIES = {
+    "Major": "P1",
+    "Moderate": "P2",
+    "Minor": "P3",
+    "No issue": "P5",
+    "None": "P5",
+}
+DEFAULT_PRIORITY = "P3"
+
+
+class OpsgenieApiError(Exception):
+    def __init__(self, path: str, status_code: Optional[int], response: dict):
+        self.path = path
+        self.status_code = status_code
+        self.response = response
+        super().__init__(f"Opsgenie API error calling {path}: {status_code} {response.get('message')}")
+
+
+def alert_alias(incident_id: int) -> str:
+    """Opsgenie deduplicates open alerts on their alias.
+
+    Creating the alert of an incident twice (a retried delivery whose first
+    attempt did get through) only bumps the count of the existing alert, and
+    later updates address the alert by alias instead of by a stored alert id.
+    """
+    return f"incident-{incident_id}"
+
+
+def alert_priority(incident: Incident) -> str:
+    if incident.p1_customer_affected:
+        return "P1"
+    return SEVERITY_PRIORITIES.get(incident.severity, DEFAULT_PRIORITY)
+
+
+def alert_payload(incident: Incident) -> dict:
+    return {
+        # Opsgenie truncates the message at 130 characters
+        "message": f"Incident {incident.id}: {incident.description}"[:130],
+        "alias": alert_alias(incident.id),
+        "description": (
+            f"Description: {incident.description}\n"
+            f"Severity: {incident.severity}\n"
+            f"Affected Products: {', '.join(incident.affected_products)}\n"
+            f"Suspected Owning Team: {', '.join(incident.suspected_owning_team)}\n"
+            f"Suspected Affected Components: {', '.join(incident.suspected_affected_components)}\n"
+            f"Start Time: {incident.start_time.isoformat()}\n"
+            f"End Time: {incident.end_time.isoformat()}\n"
+            f"Customer Affected: {'Yes' if incident.p1_customer_affected else 'No'}"
+        ),
+        "priority": alert_priority(incident),
+        "tags": [incident.severity, *incident.affected_products],
+        "details": {
+            "incident_id": str(incident.id),
+            "suspected_owning_team": ", ".join(incident.suspected_owning_team),
+        },
+        "source": "incident-bot",
     }
-    
-    response = requests.post(url,json=payload,headers=headers)
-    response.raise_for_status()
-    return response.json()
-       
\ No newline at end of file
+
+
+class AsyncOpsgenieClient(AsyncApiClient):
+    """Non-blocking Opsgenie Alert API client, alerts are addressed by alias."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.opsgenie.com",
+        max_connections: int = 10,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+    ):
+        super().__init__(
+            base_url,
+            {"Authorization": f"GenieKey {api_key}"},
+            httpx.Timeout(timeout),
+            max_connections=max_connections,
+            max_retries=max_retries,
+        )
+
+    def _transport_error(self, path: str, error: httpx.HTTPError) -> Exception:
+        return OpsgenieApiError(path, None, {"message": f"http_error: {error}"})
+
+    async def request(self, method: str, path: str, json: dict = None, params: dict = None) -> dict:
+        # Opsgenie rate limits per API key and minute, _send backs off on 429
+        response = await self._send(method, path, json=json, params=params)
+        data = response.json() if response.content else {}
+        if response.status_code >= 400:
+            raise OpsgenieApiError(path, response.status_code, data)
+        return data
+
+    async def create_alert(self, incident: Incident) -> dict:
+        # Accepted with 202, Opsgenie creates the alert asynchronously
+        return await self.request("POST", "/v2/alerts", json=alert_payload(incident))
+
+    async def alert_id(self, request_id: str, attempts: int = 3, delay: float = 0.5) -> Optional[str]:
+        """Id of the alert created by a create request, once Opsgenie has processed it."""
+        for attempt in range(attempts):
+            try:
+                status = await self.request("GET", f"/v2/alerts/requests/{request_id}")
+                if status.get("data", {}).get("alertId"):
+                    return status["data"]["alertId"]
+            except OpsgenieApiError as e:
+                # 404 until the request has been processed
+                if e.status_code != 404:
+                    raise
+            if attempt < attempts - 1:
+                await asyncio.sleep(delay)
+        return None
+
+    async def close_alert(self, incident_id: int, note: Optional[str] = None) -> dict:
+        return await self.request(
+            "POST",
+            f"/v2/alerts/{alert_alias(incident_id)}/close",
+            json={"source": "incident-bot", "note": note},
+            params={"identifierType": "alias"},
+        )
+
+    async def add_note(self, incident_id: int, note: str) -> dict:
+        return await self.request(
+            "POST",
+            f"/v2/alerts/{alert_alias(incident_id)}/notes",
+            json={"source": "incident-bot", "note": note},
+            params={"identifierType": "alias"},
+        )
+
+    async def update_priority(self, incident_id: int, priority: str) -> dict:
+        return await self.request(
+            "PUT",
+            f"/v2/alerts/{alert_alias(incident_id)}/priority",
+            json={"priority": priority},
+            params={"identifierType": "alias"},
+        )
+
+
+opsgenie_client = AsyncOpsgenieClient(
+    settings.opsgenie_api_key,
+    base_url=settings.opsgenie_api_url,
+    max_connections=settings.opsgenie_max_connections,
+    timeout=settings.opsgenie_timeout_seconds,
+)
@@ -0,0 +1,134 @@
+import asyncio
+from src import models
+from src.config import settings
+from sqlalchemy import select
+from src.database import AsyncSessionLocal
+from src.external_refs import get_ref, list_refs, save_refs
+from src.helperFunctions.opsgenie import alert_alias, opsgenie_client
+from src.helperFunctions.jira import jira_batcher
+from src.slack_messages import message_renderer
+from src.utils import post_message_to_slack, update_slack_message, create_slack_channel, wait_for_slack_channel
+
+# Every incident gets one incident_integrations outbox entry per integration, written
+# as "pending" in the same transaction as the incident and delivered by src.outbox.
+INTEGRATIONS = ("slack", "opsgenie", "jira")
+
+
+async def notify_slack(incident: models.Incident) -> str:
+    # Retried by the outbox: the channel and each message are recorded as soon as
+    # they exist, and a retry reuses them instead of creating them again
+    async with AsyncSessionLocal() as db:
+        refs = {ref.kind: ref for ref in await list_refs(db, incident.id) if ref.system == "slack"}
+
+    if "channel" in refs:
+        channel_id = refs["channel"].external_id
+        # The previous attempt may have given up waiting for the channel
+        await wait_for_slack_channel(channel_id)
+    else:
+        channel_name = f"incident-{incident.suspected_owning_team[0].replace(' ', '-').lower()}"
+        channel_id = await create_slack_channel(
+            channel_name,
+            on_created=lambda created_id: save_refs(incident.id, "slack", {"channel": (created_id, None)}),
+        )
+        # Also covers an existing channel that was reused rather than created
+        await save_refs(incident.id, "slack", {"channel": (channel_id, None)})
+
+    # Both messages come from the same rendered sections
+    incident_text, incident_blocks = message_renderer.incident_channel_message(incident)
+    outages_text, outages_blocks = message_renderer.outages_message(incident, channel_id)
+
+    async def post(kind: str, channel: str, text: str, blocks: list):
+        if kind in refs:
+            return
+        ts = await post_message_to_slack(channel, text, blocks=blocks)
+        await save_refs(incident.id, "slack", {kind: (ts, channel)})
+
+    # Let both posts finish before failing, so the one that worked is recorded
+    results = await asyncio.gather(
+        post("incident_message", channel_id, incident_text, incident_blocks),
+        post("outages_message", settings.SLACK_GENERAL_OUTAGES_CHANNEL, outages_text, outages_blocks),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+    return channel_id
+
+
+async def update_slack_messages(incident: models.Incident) -> str:
+    # Queued on every transition, edits both messages to the current status
+    async with AsyncSessionLocal() as db:
+        refs = {ref.kind: ref for ref in await list_refs(db, incident.id) if ref.system == "slack"}
+        if "incident_message" not in refs:
+            slack_status = await db.scalar(
+                select(models.IncidentIntegration.status).where(
+                    models.IncidentIntegration.incident_id == incident.id,
+                    models.IncidentIntegration.integration == "slack",
+                )
+            )
+            if slack_status == "pending":
+                raise RuntimeError("Slack messages not posted yet")
+            return "No Slack messages to update"
+
+    incident_message, outages_message = refs["incident_message"], refs.get("outages_message")
+    incident_text, incident_blocks = message_renderer.incident_channel_message(incident)
+    updates = [
+        update_slack_message(incident_message.parent_id, incident_message.external_id, incident_text, incident_blocks)
+    ]
+    if outages_message is not None:
+        outages_text, outages_blocks = message_renderer.outages_message(incident, incident_message.parent_id)
+        updates.append(
+            update_slack_message(outages_message.parent_id, outages_message.external_id, outages_text, outages_blocks)
+        )
+    await asyncio.gather(*updates)
+    return f"Updated to {incident.status}"
+
+
+async def notify_opsgenie(incident: models.Incident) -> str:
+    alert = await opsgenie_client.create_alert(incident)
+    # Alerts are created asynchronously, the alias still addresses it if the id is not known yet
+    alert_id = await opsgenie_client.alert_id(alert["requestId"]) or alert_alias(incident.id)
+    await save_refs(incident.id, "opsgenie", {"alert": (alert_id, None)})
+    return alert_id
+
+
+async def close_opsgenie_alert(incident: models.Incident) -> str:
+    # Queued when the incident is resolved; wait for the alert to exist first
+    async with AsyncSessionLocal() as db:
+        alert = await get_ref(db, incident.id, "opsgenie", "alert")
+        if alert is None:
+            alert_status = await db.scalar(
+                select(models.IncidentIntegration.status).where(
+                    models.IncidentIntegration.incident_id == incident.id,
+                    models.IncidentIntegration.integration == "opsgenie",
+                )
+            )
+            if alert_status == "pending":
+                raise RuntimeError("Opsgenie alert not created yet")
+            # Alerts created before refs were recorded have none; the close
+            # goes by alias, so only a failed creation means there is nothing to close
+            if alert_status != "succeeded":
+                return "No Opsgenie alert to close"
+    result = await opsgenie_client.close_alert(incident.id, note=f"Incident {incident.id} resolved")
+    return result.get("requestId")
+
+
+async def notify_jira(incident: models.Incident) -> str:
+    # Batched with the other tickets being created right now
+    issue = await jira_batcher.create_issue(incident)
+    await save_refs(incident.id, "jira", {"issue": (issue["key"], None)})
+    return issue["key"]
+
+
+HANDLERS = {
+    "slack": notify_slack,
+    "opsgenie": notify_opsgenie,
+    "jira": notify_jira,
+    "opsgenie_close": close_opsgenie_alert,
+    "slack_update": update_slack_messages,
+}
+
+
+def error_detail(error: Exception) -> str:
+    detail = getattr(error, "detail", None) or str(error) or error.__class__.__name__
+    return str(detail)[:500]
@@ -0,0 +1,127 @@
+import httpx
+from src.config import settings
+from src.helperFunctions.http_client import AsyncApiClient
+
+SLACK_API_URL = "https://slack.com/api/"
+
+
+# Errors a retry cannot fix: the bot is not in the channel, the channel is gone
+# or the token is no longer valid
+PERMANENT_ERRORS = frozenset(
+    {
+        "not_in_channel",
+        "channel_not_found",
+        "is_archived",
+        "invalid_auth",
+        "account_inactive",
+        "token_revoked",
+        "missing_scope",
+    }
+)
+
+
+class SlackApiError(Exception):
+    """Raised when Slack answers with ok=false or the request itself fails.
+
+    Mirrors slack_sdk's error so callers can keep reading e.response["error"].
+    """
+
+    def __init__(self, method: str, response: dict):
+        self.method = method
+        self.response = response
+        super().__init__(f"Slack API error calling {method}: {response.get('error')}")
+
+
+class AsyncSlackClient(AsyncApiClient):
+    """Non-blocking Slack Web API client.
+
+    Connections are multiplexed over HTTP/2, and max_concurrency bounds the
+    requests in flight so an incident storm cannot open an unbounded number
+    of sockets or trip Slack's rate limits all at once.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        max_connections: int = 20,
+        max_concurrency: int = 10,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+    ):
+        super().__init__(
+            SLACK_API_URL,
+            {"Authorization": f"Bearer {token}"},
+            httpx.Timeout(timeout),
+            max_connections=max_connections,
+            max_concurrency=max_concurrency,
+            max_retries=max_retries,
+            http2=True,
+        )
+
+    def _transport_error(self, method: str, error: httpx.HTTPError) -> Exception:
+        return SlackApiError(method, {"ok": False, "error": f"http_error: {error}"})
+
+    def _retry_delay(self, attempt: int) -> float:
+        return 1
+
+    async def api_call(
+        self, method: str, *, json: dict = None, content: bytes = None, params: dict = None
+    ) -> dict:
+        if json is not None:
+            response = await self._send("POST", method, json=json)
+        elif content is not None:
+            response = await self._send(
+                "POST",
+                method,
+                content=content,
+                headers={"Content-Type": "application/json; charset=utf-8"},
+            )
+        else:
+            response = await self._send("GET", method, params=params)
+
+        if response.status_code >= 400:
+            raise SlackApiError(
+                method, {"ok": False, "error": f"http_status_{response.status_code}"}
+            )
+        data = response.json()
+        if not data.get("ok"):
+            raise SlackApiError(method, data)
+        return data
+
+    async def conversations_list(self, **params) -> dict:
+        return await self.api_call("conversations.list", params=params)
+
+    async def conversations_create(self, name: str, is_private: bool = False) -> dict:
+        return await self.api_call(
+            "conversations.create", json={"name": name, "is_private": is_private}
+        )
+
+    async def conversations_info(self, channel: str) -> dict:
+        return await self.api_call("conversations.info", params={"channel": channel})
+
+    async def chat_postMessage(self, channel: str, text: str, **kwargs) -> dict:
+        return await self.api_call(
+            "chat.postMessage", json={"channel": channel, "text": text, **kwargs}
+        )
+
+    async def chat_update(self, channel: str, ts: str, text: str, **kwargs) -> dict:
+        return await self.api_call(
+            "chat.update", json={"channel": channel, "ts": ts, "text": text, **kwargs}
+        )
+
+    async def views_open(self, trigger_id: str, view: dict) -> dict:
+        return await self.api_call(
+            "views.open", json={"trigger_id": trigger_id, "view": view}
+        )
+
+    async def views_open_payload(self, payload: bytes) -> dict:
+        """views.open with an already serialized {"trigger_id", "view"} body."""
+        return await self.api_call("views.open", content=payload)
+
+
+slack_client = AsyncSlackClient(
+    settings.SLACK_BOT_TOKEN,
+    max_connections=settings.slack_max_connections,
+    max_concurrency=settings.slack_max_concurrency,
+    timeout=settings.slack_timeout_seconds,
+)
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Dict, Optional
+from src.config import settings
+from src.helperFunctions.slack import AsyncSlackClient, slack_client
+from src.metrics import metrics
+
+
+class ChannelDirectory:
+    """Cache of Slack channel name -> channel ID.
+
+    The whole workspace is loaded page by page with conversations.list, so
+    lookups are a dict access instead of a list call and linear scan per
+    incident. The index is rebuilt when it is older than `ttl` seconds and kept
+    current in between by the channel_* events received on /slack/events.
+
+    Within the TTL a miss is authoritative: channels created here are added
+    as they are created and the events cover the rest, so looking up a channel
+    that does not exist (the usual case, incident channels get a unique name)
+    costs no conversations.list call.
+    """
+
+    def __init__(
+        self,
+        client: AsyncSlackClient,
+        ttl: float = 300.0,
+        page_size: int = 1000,
+    ):
+        self._client = client
+        self._ttl = ttl
+        self._page_size = page_size
+        self._by_name: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self._ttl
+
+    async def refresh(self, max_age: float = 0.0):
+        """Reload every page of conversations.list and swap the index in one go.
+
+        Concurrent callers wait for the reload already in flight instead of
+        starting their own; `max_age` skips the reload if the index is fresher.
+        """
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < max_age:
+                return
+
+            started = time.monotonic()
+            by_name = {}
+            cursor = None
+            while True:
+                params = {
+                    "limit": self._page_size,
+                    "exclude_archived": "true",
+                    "types": "public_channel,private_channel",
+                }
+                if cursor:
+                    params["cursor"] = cursor
+                response = await self._client.conversations_list(**params)
+                for channel in response["channels"]:
+                    by_name[channel["name"]] = channel["id"]
+                cursor = response.get("response_metadata", {}).get("next_cursor")
+                if not cursor:
+                    break
+
+            self._by_name = by_name
+            self._loaded_at = time.monotonic()
+            metrics.observe("slack_channel_directory_refresh_seconds", self._loaded_at - started)
+            print(f"Channel directory loaded with {len(by_name)} channels")
+
+    async def get(self, channel_name: str) -> Optional[str]:
+        if self.is_stale:
+            await self.refresh(max_age=self._ttl)
+
+        channel_id = self._by_name.get(channel_name)
+        metrics.increment("slack_channel_directory_hits" if channel_id else "slack_channel_directory_misses")
+        return channel_id
+
+    def add(self, channel_name: str, channel_id: str):
+        # Drop any previous name of the channel first, this also covers renames
+        self.remove(channel_id)
+        self._by_name[channel_name] = channel_id
+
+    def remove(self, channel_id: str):
+        self._by_name = {
+            name: cid for name, cid in self._by_name.items() if cid != channel_id
+        }
+
+    def handle_event(self, event: dict):
+        """Apply a channel_* event from the Slack Events API to the index."""
+        event_type = event.get("type")
+        channel = event.get("channel")
+        if event_type in ("channel_created", "channel_rename", "channel_unarchive"):
+            if isinstance(channel, dict) and channel.get("name"):
+                self.add(channel["name"], channel["id"])
+            elif event_type == "channel_unarchive":
+                # The unarchive event only carries the ID, reload on next lookup
+                self._loaded_at = None
+        elif event_type in ("channel_deleted", "channel_archive"):
+            self.remove(channel if isinstance(channel, str) else channel.get("id"))
+
+
+channel_directory = ChannelDirectory(
+    slack_client,
+    ttl=settings.slack_channel_cache_ttl_seconds,
+)
@@ -0,0 +1,56 @@
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+from src.config import settings
+
+
+class IdempotencyCache:
+    """Small LRU of recently completed request keys with a time to live.
+
+    Answers the common case of a duplicate delivery (Slack retrying a request
+    it thinks timed out) without a database round trip. It only holds keys
+    this worker has seen; the unique constraint behind it is what actually
+    guarantees a key is processed once across workers and restarts.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[object]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: object):
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def slack_view_key(view: dict) -> Optional[str]:
+    """Idempotency key of a view submission.
+
+    Slack sends the same view id and hash on every retry of a submission, and a
+    new hash whenever the view is updated.
+    """
+    if not view.get("id"):
+        return None
+    return f"slack-view:{view['id']}:{view.get('hash', '')}"
+
+
+# View submission key -> incident id
+submission_cache = IdempotencyCache(
+    settings.slack_idempotency_cache_size, settings.slack_idempotency_ttl_seconds
+)
@@ -0,0 +1,136 @@
+from typing import Optional
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import models
+
+OPEN = "open"
+INVESTIGATING = "investigating"
+MITIGATED = "mitigated"
+RESOLVED = "resolved"
+
+STATUSES = (OPEN, INVESTIGATING, MITIGATED, RESOLVED)
+
+# Statuses an incident may move to from each status. Mitigations can turn out
+# not to hold, so mitigated may go back to investigating; resolved is final.
+TRANSITIONS = {
+    OPEN: (INVESTIGATING, MITIGATED, RESOLVED),
+    INVESTIGATING: (MITIGATED, RESOLVED),
+    MITIGATED: (INVESTIGATING, RESOLVED),
+    RESOLVED: (),
+}
+
+TRANSITION_ACTION_ID = "incident_transition"
+
+# Outbox entries queued in the same transaction as every transition, and as a
+# move to resolved. Requeuing an entry makes it pending again with a fresh claim,
+# so its delivery always renders the latest state. If the entry is being
+# delivered at that moment, the requeued delivery waits for that one to finish
+# (see src.outbox.record_outcome) instead of racing it.
+TRANSITION_INTEGRATIONS = ("slack_update",)
+RESOLVE_INTEGRATIONS = ("opsgenie_close",)
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class IncidentNotFound(LookupError):
+    pass
+
+
+async def transition_incident(
+    db: AsyncSession,
+    incident_id: int,
+    to_status: str,
+    actor: Optional[str] = None,
+    source: str = "api",
+) -> models.IncidentEvent:
+    """Move an incident to `to_status` and append the change to incident_events.
+
+    The incident row is locked while the transition is checked, so two people
+    pressing different buttons at the same moment cannot both succeed from the
+    same starting status. Status change and event are committed together, with
+    the outbox entries that update the Slack messages and, when it is resolved,
+    close the incident elsewhere.
+    """
+    if to_status not in STATUSES:
+        raise InvalidTransition(f"Unknown status {to_status}")
+
+    from_status = await db.scalar(
+        select(models.Incident.status)
+        .where(models.Incident.id == incident_id)
+        .with_for_update()
+    )
+    if from_status is None:
+        await db.rollback()
+        raise IncidentNotFound(f"Incident {incident_id} not found")
+    if to_status not in TRANSITIONS[from_status]:
+        await db.rollback()
+        raise InvalidTransition(f"Incident {incident_id} cannot move from {from_status} to {to_status}")
+
+    await db.execute(
+        update(models.Incident)
+        .where(models.Incident.id == incident_id)
+        .values(status=to_status)
+    )
+    event = await db.scalar(
+        insert(models.IncidentEvent)
+        .values(
+            incident_id=incident_id,
+            from_status=from_status,
+            to_status=to_status,
+            actor=actor,
+            source=source,
+        )
+        .returning(models.IncidentEvent)
+    )
+    integrations = TRANSITION_INTEGRATIONS + (RESOLVE_INTEGRATIONS if to_status == RESOLVED else ())
+    queued = postgresql.insert(models.IncidentIntegration).values(
+        [{"incident_id": incident_id, "integration": name, "status": "pending"} for name in integrations]
+    )
+    await db.execute(
+        queued.on_conflict_do_update(
+            constraint="uq_incident_integrations_incident_integration",
+            set_={
+                "status": "pending",
+                "attempts": 0,
+                "detail": None,
+                # An in-flight delivery loses its claim; keep its lease so the
+                # requeued one is not picked up while it is still sending
+                "claim_token": None,
+                "next_attempt_at": func.greatest(models.IncidentIntegration.next_attempt_at, func.now()),
+                "updated_at": func.now(),
+            },
+        )
+    )
+    await db.commit()
+    return event
+
+
+async def list_events(db: AsyncSession, incident_id: int) -> list:
+    return list(
+        await db.scalars(
+            select(models.IncidentEvent)
+            .where(models.IncidentEvent.incident_id == incident_id)
+            .order_by(models.IncidentEvent.created_at, models.IncidentEvent.id)
+        )
+    )
+
+
+def transition_actions_block(incident_id: int, status: str = OPEN) -> dict:
+    """Slack buttons for the transitions available from `status`."""
+    return {
+        "type": "actions",
+        "block_id": f"incident_lifecycle_{incident_id}",
+        "elements": [
+            {
+                "type": "button",
+                "text": {"type": "plain_text", "text": f"Mark {to_status}"},
+                "action_id": f"{TRANSITION_ACTION_ID}_{to_status}",
+                "value": f"{incident_id}:{to_status}",
+                **({"style": "primary"} if to_status == RESOLVED else {}),
+            }
+            for to_status in TRANSITIONS[status]
+        ],
+    }
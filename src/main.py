@@ -1,30 +1,60 @@
 from fastapi import FastAPI,Request,HTTPException,status
-from src.routers import incident # type: ignore
-from src.utils import load_options_from_file
+from src.routers import incident, incidents # type: ignore
 from src.database import get_db
 from src.config import settings
 from src.schemas import IncidentCreate
 from src.models import Incident
 from src.utils import post_message_to_slack, create_slack_channel
-import os
-
-options = {}
+from src.helperFunctions.slack import slack_client
+from src.helperFunctions.opsgenie import opsgenie_client
+from src.helperFunctions.jira import jira_batcher, jira_client
+from src.helperFunctions.slack_channels import channel_directory
+from src.metrics import metrics
+from src.options_registry import options_registry
+from src.stats import stats_refresher
+from src.outbox import outbox_dispatcher
 
 app = FastAPI()
-file_path = os.path.join(os.path.dirname(__file__), 'options.json')
 
 app.include_router(incident.router)
+app.include_router(incidents.router)
 
 @app.get("/")
 def root():
     return {"message": "Hello World"}
 
 
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
+
+
 @app.on_event("startup")
 async def startup_event():
-    global options
     try:
-        options = await load_options_from_file(file_path)
+        options_registry.load()
         print(f"Options loaded successfully")
     except Exception as e:
         print(f"Error loading options: {e}")
+    # Pick up edits to options.json without restarting the workers
+    options_registry.start_watching()
+
+    # Warm the channel name -> ID cache so the first incident does not pay for it
+    try:
+        await channel_directory.refresh()
+    except Exception as e:
+        print(f"Error loading Slack channels: {e}")
+
+    stats_refresher.start()
+    outbox_dispatcher.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await options_registry.stop_watching()
+    await stats_refresher.stop()
+    await outbox_dispatcher.stop()
+    await slack_client.aclose()
+    await opsgenie_client.aclose()
+    await jira_batcher.aclose()
+    await jira_client.aclose()
@@ -0,0 +1,74 @@
+import threading
+from typing import Callable, Dict
+
+
+class Summary:
+    """Running count/sum/min/max of an observed value (e.g. a latency in seconds)."""
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self.last = None
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.last = value
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.sum / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "last": self.last,
+        }
+
+
+class MetricsRegistry:
+    """In-process metrics exposed as JSON on GET /metrics.
+
+    Counters and summaries are updated by the code paths they measure, gauges
+    are callables evaluated when the metrics are read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._summaries: Dict[str, Summary] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def increment(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self._summaries.setdefault(name, Summary()).observe(value)
+
+    def register_gauge(self, name: str, callback: Callable[[], float]):
+        with self._lock:
+            self._gauges[name] = callback
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            summaries = {name: s.snapshot() for name, s in self._summaries.items()}
+            gauges = dict(self._gauges)
+
+        gauge_values = {}
+        for name, callback in gauges.items():
+            try:
+                gauge_values[name] = callback()
+            except Exception as e:
+                print(f"Failed to read gauge {name}: {e}")
+                gauge_values[name] = None
+        return {"counters": counters, "gauges": gauge_values, "summaries": summaries}
+
+
+metrics = MetricsRegistry()
@@ -1,14 +1,38 @@
 from .database import Base
 from datetime import datetime
-from sqlalchemy import Column,Integer,String,Boolean,DateTime # type: ignore
+from sqlalchemy import CheckConstraint,Column,Computed,Integer,String,Boolean,DateTime,ForeignKey,Index,UniqueConstraint,func,text # type: ignore
 from sqlalchemy.ext.declarative import declarative_base # type: ignore
-from sqlalchemy.dialects.postgresql import ARRAY # type: ignore
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR # type: ignore
+from sqlalchemy.orm import deferred, relationship # type: ignore
 
 Base = declarative_base()
 
+# Full-text document of an incident. incident_array_text is an IMMUTABLE wrapper
+# around array_to_string (created by migration 4b7e2d9c6f10), which generated
+# columns require. Description ranks above the SP message, products and teams.
+INCIDENT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(description, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(message_for_sp, '')), 'B') || "
+    "setweight(to_tsvector('english', incident_array_text(affected_products) || ' ' || incident_array_text(suspected_owning_team)), 'C')"
+)
+
 
 class Incident(Base):
     __tablename__ = "service_incidents"
+    # Listing is keyset paginated on (created_at, id), newest first, optionally
+    # narrowed by status/severity or by array containment/overlap on the ARRAY columns
+    __table_args__ = (
+        Index("ix_service_incidents_created_at_id", "created_at", "id"),
+        Index("ix_service_incidents_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_service_incidents_severity_created_at_id", "severity", "created_at", "id"),
+        Index("ix_service_incidents_suspected_owning_team_gin", "suspected_owning_team", postgresql_using="gin"),
+        Index("ix_service_incidents_affected_products_gin", "affected_products", postgresql_using="gin"),
+        Index("ix_service_incidents_suspected_affected_components_gin", "suspected_affected_components", postgresql_using="gin"),
+        Index("ix_service_incidents_search_vector", "search_vector", postgresql_using="gin"),
+        # Only unresolved incidents, so listing open incidents never touches resolved history
+        Index("ix_service_incidents_unresolved_created_at_id", "created_at", "id", postgresql_where=text("status <> 'resolved'")),
+        CheckConstraint("status IN ('open', 'investigating', 'mitigated', 'resolved')", name="ck_service_incidents_status"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     affected_products = Column(ARRAY(String), nullable=False)
     severity = Column(String(50),nullable=False)
@@ -17,12 +41,88 @@ class Incident(Base):
     end_time = Column(DateTime, nullable=False)
     p1_customer_affected = Column(Boolean, default=False, nullable=False)
     suspected_affected_components = Column(ARRAY(String), nullable=False)
-    description = Column(String(250), index=True, nullable=False)
+    description = Column(String(250), nullable=False)
     message_for_sp = Column(String(250), nullable=True)
     statuspage_notification = Column(Boolean, default=False, nullable=False)
     separate_channel_creation = Column(Boolean, default=False, nullable=False)
-    status = Column(String(50), index=True, nullable=True)
-    created_at = Column(DateTime, nullable=True, default=datetime.now()) 
+    status = Column(String(50), nullable=False, default="open", server_default="open")
+    created_at = Column(DateTime, nullable=False, default=datetime.now, server_default=func.now())
+    # Set for incidents created from a Slack view submission, see src.idempotency
+    idempotency_key = Column(String(100), nullable=True, unique=True)
+    # Only read by search queries, keep it out of every other SELECT and RETURNING
+    search_vector = deferred(Column(TSVECTOR, Computed(INCIDENT_SEARCH_VECTOR, persisted=True)))
+    integrations = relationship("IncidentIntegration", back_populates="incident", cascade="all, delete-orphan", passive_deletes=True)
+
+    def __repr__(self):
+        return f"<Incident(id={self.id}, affected_products={self.affected_products}, severity={self.severity}, start_time={self.start_time}, end_time={self.end_time}, status={self.status})>"
+
+
+class IncidentIntegration(Base):
+    """Outbox entry for one side effect (slack, opsgenie, jira) of an incident.
+
+    Written as "pending" in the same transaction as the incident and delivered
+    by src.outbox.OutboxDispatcher, which retries until it succeeds or runs out
+    of attempts ("succeeded" / "failed").
+    """
+    __tablename__ = "incident_integrations"
+    __table_args__ = (
+        UniqueConstraint("incident_id", "integration", name="uq_incident_integrations_incident_integration"),
+        # The dispatcher polls for pending entries that are due
+        Index("ix_incident_integrations_pending_next_attempt_at", "next_attempt_at", postgresql_where=text("status = 'pending'")),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    incident_id = Column(Integer, ForeignKey("service_incidents.id", ondelete="CASCADE"), index=True, nullable=False)
+    integration = Column(String(50), nullable=False)
+    status = Column(String(50), nullable=False, default="pending")
+    detail = Column(String(500), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime, nullable=False, server_default=func.now())
+    # Set by each claim; an outcome is only recorded by the claim that still owns the entry
+    claim_token = Column(String(32), nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+    incident = relationship("Incident", back_populates="integrations")
+
+    def __repr__(self):
+        return f"<IncidentIntegration(incident_id={self.incident_id}, integration={self.integration}, status={self.status})>"
+
+
+
+class IncidentEvent(Base):
+    """Append-only history of incident status transitions."""
+    __tablename__ = "incident_events"
+    __table_args__ = (Index("ix_incident_events_incident_id_created_at", "incident_id", "created_at"),)
+    id = Column(Integer, primary_key=True)
+    incident_id = Column(Integer, ForeignKey("service_incidents.id", ondelete="CASCADE"), nullable=False)
+    from_status = Column(String(50), nullable=True)
+    to_status = Column(String(50), nullable=False)
+    actor = Column(String(100), nullable=True)
+    source = Column(String(50), nullable=False, default="api")
+    created_at = Column(DateTime, nullable=False, default=datetime.now, server_default=func.now())
+
+    def __repr__(self):
+        return f"<IncidentEvent(incident_id={self.incident_id}, from_status={self.from_status}, to_status={self.to_status})>"
+
+
+class IncidentExternalRef(Base):
+    """Where an incident lives in another system: Jira issue, Opsgenie alert, Slack channel and messages.
+
+    One row per (incident, system, kind), so follow-up calls address the
+    existing object instead of searching for it. parent_id scopes ids that are
+    only unique within something else, the channel of a Slack message ts.
+    """
+    __tablename__ = "incident_external_refs"
+    __table_args__ = (
+        UniqueConstraint("incident_id", "system", "kind", name="uq_incident_external_refs_incident_system_kind"),
+        # Reverse lookup: which incident does this Jira key / channel / alert belong to
+        Index("ix_incident_external_refs_system_external_id", "system", "external_id"),
+    )
+    id = Column(Integer, primary_key=True)
+    incident_id = Column(Integer, ForeignKey("service_incidents.id", ondelete="CASCADE"), nullable=False)
+    system = Column(String(50), nullable=False)
+    kind = Column(String(50), nullable=False)
+    external_id = Column(String(100), nullable=False)
+    parent_id = Column(String(100), nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now, server_default=func.now())
 
     def __repr__(self):
-        return f"<Incident(id={self.id}, affected_products={self.affected_products}, severity={self.severity}, start_time={self.start_time}, end_time={self.end_time}, status={self.status})>"
\ No newline at end of file
+        return f"<IncidentExternalRef(incident_id={self.incident_id}, system={self.system}, kind={self.kind}, external_id={self.external_id})>"
@@ -0,0 +1,88 @@
+import bisect
+from typing import Dict, List, Set, Tuple
+from src.options_registry import OptionsSnapshot
+
+# Slack shows at most 100 options in a select menu
+MAX_SUGGESTIONS = 100
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class OptionsIndex:
+    """Prefix and trigram index over the options of one category.
+
+    Queries shorter than three characters are answered by bisecting a sorted
+    list of words, longer ones by intersecting trigram posting sets and then
+    confirming the substring match. Either way only candidate options are
+    touched, not the whole catalog.
+    """
+
+    def __init__(self, items: List[dict]):
+        self._items = items
+        self._texts = [item["text"].lower() for item in items]
+        self._words: List[Tuple[str, int]] = sorted(
+            (word, position)
+            for position, text in enumerate(self._texts)
+            for word in text.split()
+        )
+        self._trigrams: Dict[str, Set[int]] = {}
+        for position, text in enumerate(self._texts):
+            for trigram in _trigrams(text):
+                self._trigrams.setdefault(trigram, set()).add(position)
+
+    def _prefix_candidates(self, query: str) -> Set[int]:
+        candidates = set()
+        start = bisect.bisect_left(self._words, (query, -1))
+        for word, position in self._words[start:]:
+            if not word.startswith(query):
+                break
+            candidates.add(position)
+        return candidates
+
+    def _trigram_candidates(self, query: str) -> Set[int]:
+        postings = sorted(
+            (self._trigrams.get(trigram, set()) for trigram in _trigrams(query)), key=len
+        )
+        if not postings or not postings[0]:
+            return set()
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {position for position in candidates if query in self._texts[position]}
+
+    def search(self, query: str, limit: int = MAX_SUGGESTIONS) -> List[dict]:
+        query = " ".join(query.lower().split())
+        if not query:
+            return self._items[:limit]
+
+        if len(query) < 3:
+            candidates = self._prefix_candidates(query)
+        else:
+            candidates = self._trigram_candidates(query)
+
+        # Options starting with the query first, then word prefixes, then any substring
+        def rank(position: int):
+            text = self._texts[position]
+            if text.startswith(query):
+                return (0, text)
+            if f" {query}" in f" {text}":
+                return (1, text)
+            return (2, text)
+
+        return [self._items[position] for position in sorted(candidates, key=rank)[:limit]]
+
+
+_indexes: Dict[Tuple[int, str], OptionsIndex] = {}
+
+
+def options_index(snapshot: OptionsSnapshot, category: str) -> OptionsIndex:
+    """Index for a category, built once per options registry version."""
+    key = (snapshot.version, category)
+    index = _indexes.get(key)
+    if index is None:
+        # Indexes of older versions are no longer reachable, drop them
+        for stale in [k for k in _indexes if k[0] != snapshot.version]:
+            del _indexes[stale]
+        index = OptionsIndex(snapshot[category])
+        _indexes[key] = index
+    return index
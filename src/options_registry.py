@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import os
+from typing import Dict, List, Optional
+import orjson
+from pydantic import BaseModel, field_validator
+from watchfiles import awatch
+
+OPTIONS_FILE_PATH = os.path.join(os.path.dirname(__file__), "options.json")
+
+
+class OptionItem(BaseModel):
+    """One selectable option in the incident form."""
+
+    text: str
+    value: str
+
+
+class OptionsFile(BaseModel):
+    """Schema of options.json."""
+
+    affected_products: List[OptionItem]
+    severity: List[OptionItem]
+    suspected_owning_team: List[OptionItem]
+    suspected_affected_components: List[OptionItem]
+
+    @field_validator("*")
+    @classmethod
+    def check_unique_values(cls, items: List[OptionItem]) -> List[OptionItem]:
+        if not items:
+            raise ValueError("must contain at least one option")
+        values = [item.value for item in items]
+        duplicates = sorted({value for value in values if values.count(value) > 1})
+        if duplicates:
+            raise ValueError(f"duplicate option values: {duplicates}")
+        return items
+
+
+class OptionsSnapshot:
+    """An immutable, validated version of options.json indexed by option value."""
+
+    def __init__(self, version: int, digest: str, options: OptionsFile):
+        self.version = version
+        self.digest = digest
+        self.options: Dict[str, List[dict]] = options.model_dump()
+        self.by_value: Dict[str, Dict[str, dict]] = {
+            category: {item["value"]: item for item in items}
+            for category, items in self.options.items()
+        }
+
+    def __getitem__(self, category: str) -> List[dict]:
+        return self.options[category]
+
+    def lookup(self, category: str, value: str) -> Optional[dict]:
+        """The option with `value` in `category`, None if there is no such option."""
+        return self.by_value.get(category, {}).get(value)
+
+
+class OptionsRegistry:
+    """Single owner of the form options.
+
+    The file is loaded and validated once, and every reader goes through
+    `snapshot`. When the file changes on disk the new content is validated and
+    swapped in as a whole, so a request never sees a half-loaded catalog and a
+    broken edit leaves the previous version in place.
+    """
+
+    def __init__(self, file_path: str = OPTIONS_FILE_PATH):
+        self._file_path = os.path.abspath(file_path)
+        self._snapshot: Optional[OptionsSnapshot] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+
+    @property
+    def snapshot(self) -> OptionsSnapshot:
+        if self._snapshot is None:
+            self.load()
+        return self._snapshot
+
+    def load(self) -> OptionsSnapshot:
+        with open(self._file_path, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        current = self._snapshot
+        if current is not None and current.digest == digest:
+            return current
+
+        options = OptionsFile.model_validate(orjson.loads(content))
+        version = current.version + 1 if current is not None else 1
+        self._snapshot = OptionsSnapshot(version, digest, options)
+        print(f"Options version {version} loaded from {self._file_path}")
+        return self._snapshot
+
+    async def _watch(self):
+        # Watch the directory rather than the file, editors often replace the
+        # file instead of writing to it which would end a watch on the file itself
+        directory, name = os.path.split(self._file_path)
+        async for _ in awatch(
+            directory,
+            watch_filter=lambda change, path: os.path.basename(path) == name,
+            stop_event=self._stop_event,
+        ):
+            try:
+                self.load()
+            except Exception as e:
+                print(f"Error reloading options, keeping version {self._snapshot.version}: {e}")
+
+    def start_watching(self):
+        if self._watch_task is None:
+            self._stop_event = asyncio.Event()
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop_watching(self):
+        if self._watch_task is not None:
+            self._stop_event.set()
+            await self._watch_task
+            self._watch_task = None
+
+
+options_registry = OptionsRegistry()
@@ -0,0 +1,199 @@
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import func, select, update
+from src import models
+from src.config import settings
+from src.database import AsyncSessionLocal
+from src.helperFunctions.errors import PermanentDeliveryError
+from src.helperFunctions.side_effects import HANDLERS, error_detail
+from src.metrics import metrics
+
+Outbox = models.IncidentIntegration
+
+OUTCOME_COUNTERS = {
+    "succeeded": "outbox_delivered",
+    "pending": "outbox_retries_scheduled",
+    "failed": "outbox_gave_up",
+    None: "outbox_stale_outcomes",
+}
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before retrying after the `attempts`-th failed delivery.
+
+    Exponential from outbox_backoff_base_seconds, capped at
+    outbox_backoff_max_seconds, with the upper half jittered so entries that
+    failed together (a third party outage) do not all come back at once.
+    """
+    delay = min(
+        settings.outbox_backoff_max_seconds,
+        settings.outbox_backoff_base_seconds * 2 ** (attempts - 1),
+    )
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def claim_due(limit: int) -> List[tuple]:
+    """Lease up to `limit` due pending entries to this worker.
+
+    FOR UPDATE SKIP LOCKED lets every worker poll the same table without
+    handing out the same entry twice. Claiming pushes next_attempt_at out by
+    the lease, so entries of a worker that dies mid delivery come back once
+    the lease runs out instead of being lost. The attempt is counted here for
+    the same reason. Each claim gets a new claim_token, which its outcome has
+    to match to be recorded.
+    """
+    due = (
+        select(Outbox.id)
+        .where(Outbox.status == "pending", Outbox.next_attempt_at <= func.now())
+        .order_by(Outbox.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(Outbox)
+            .where(Outbox.id.in_(due))
+            .values(
+                attempts=Outbox.attempts + 1,
+                claim_token=uuid.uuid4().hex,
+                next_attempt_at=func.now() + timedelta(seconds=settings.outbox_lease_seconds),
+            )
+            .returning(Outbox.id, Outbox.incident_id, Outbox.integration, Outbox.attempts, Outbox.claim_token)
+        )
+        claimed = list(result.tuples())
+        await db.commit()
+    return claimed
+
+
+async def record_outcome(
+    entry_id: int, claim_token: str, attempts: int, error: Optional[Exception], detail: Optional[str]
+) -> Optional[str]:
+    """Record the outcome of a claimed delivery, if the claim still owns the entry.
+
+    The entry may have been requeued while it was being delivered (a newer
+    transition) or reclaimed after its lease ran out. Then this outcome is
+    stale and is dropped, and a requeued entry is made due right away: it was
+    held back until now so that the two deliveries do not race. Returns the
+    recorded status, None when the outcome was dropped.
+    """
+    # Finished entries give up their lease, so requeuing one makes it due at once
+    values = {"detail": detail, "updated_at": datetime.now(), "next_attempt_at": func.now()}
+    if error is None:
+        values["status"] = "succeeded"
+    elif isinstance(error, PermanentDeliveryError) or attempts >= settings.outbox_max_attempts:
+        # Retrying an error that cannot go away only delays the failure
+        values["status"] = "failed"
+    else:
+        values["next_attempt_at"] = func.now() + timedelta(seconds=backoff_seconds(attempts))
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(Outbox)
+            .where(Outbox.id == entry_id, Outbox.claim_token == claim_token)
+            .values(**values)
+        )
+        if result.rowcount == 0:
+            await db.execute(
+                update(Outbox)
+                .where(Outbox.id == entry_id, Outbox.status == "pending", Outbox.claim_token.is_(None))
+                .values(next_attempt_at=func.now())
+            )
+        await db.commit()
+    if result.rowcount == 0:
+        return None
+    return values.get("status", "pending")
+
+
+class OutboxDispatcher:
+    """Delivers incident_integrations entries to Slack, Opsgenie and Jira.
+
+    Entries are written in the same transaction as the incident, so a side
+    effect is never lost when the process dies or a third party is down after
+    the commit. The dispatcher polls for due entries every poll interval, or
+    straight away when wake() is called after a submission, and delivers a
+    batch concurrently. Failures are retried with exponential backoff up to
+    outbox_max_attempts, except PermanentDeliveryError which fails at once.
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self._interval = interval
+        self._batch_size = batch_size
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def wake(self):
+        self._wakeup.set()
+
+    async def deliver(
+        self, entry_id: int, incident: Optional[models.Incident], integration: str, attempts: int, claim_token: str
+    ):
+        started = time.perf_counter()
+        error = None
+        try:
+            if incident is None:
+                raise LookupError("Incident not found")
+            detail = await HANDLERS[integration](incident)
+        except Exception as e:
+            error = e
+            detail = error_detail(e)
+        metrics.observe(f"outbox_{integration}_delivery_seconds", time.perf_counter() - started)
+
+        outcome = await record_outcome(entry_id, claim_token, attempts, error, detail)
+        metrics.increment(OUTCOME_COUNTERS[outcome])
+        print(f"Incident {incident.id if incident else '?'} {integration} delivery attempt {attempts} {outcome or 'superseded'}: {detail}")
+
+    async def dispatch_once(self) -> int:
+        claimed = await claim_due(self._batch_size)
+        if not claimed:
+            return 0
+
+        incident_ids = {incident_id for _, incident_id, _, _, _ in claimed}
+        async with AsyncSessionLocal() as db:
+            incidents = {
+                incident.id: incident
+                for incident in await db.scalars(
+                    select(models.Incident).where(models.Incident.id.in_(incident_ids))
+                )
+            }
+
+        # A failing integration does not hold up or cancel the others
+        await asyncio.gather(
+            *(
+                self.deliver(entry_id, incidents.get(incident_id), integration, attempts, claim_token)
+                for entry_id, incident_id, integration, attempts, claim_token in claimed
+            )
+        )
+        return len(claimed)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                # Keep going while full batches come back, there is a backlog
+                while await self.dispatch_once() >= self._batch_size:
+                    pass
+            except Exception as e:
+                print(f"Error dispatching incident side effects: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+outbox_dispatcher = OutboxDispatcher(settings.outbox_poll_interval_seconds, settings.outbox_batch_size)
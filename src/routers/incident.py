@@ -1,19 +1,24 @@
 from fastapi import APIRouter, Request, Response, HTTPException, Header, status, Depends
 from typing import List
-from sqlalchemy.orm import Session
-from src import models
+from sqlalchemy.ext.asyncio import AsyncSession
 from src import schemas
-from src.database import get_db
-from src.utils import verify_slack_request, create_modal_view
+from src.database import get_async_db
+from src.utils import verify_slack_request, modal_view_cache, slack_challenge_parameter_verification
 from starlette.responses import JSONResponse
 from src.config import settings
-import requests
 import json
 from pydantic import ValidationError
 from datetime import datetime
-from src.helperFunctions.opsgenie import create_alert
-from src.helperFunctions.jira import create_jira_ticket
-from src.utils import post_message_to_slack, create_slack_channel,get_channel_id
+from src.helperFunctions.slack import slack_client, SlackApiError
+from src.helperFunctions.slack_channels import channel_directory
+from src.options_registry import options_registry
+from src.options_index import options_index
+from src.outbox import outbox_dispatcher
+from src.crud import incident_id_for_key, insert_incident
+from src.idempotency import slack_view_key, submission_cache
+from src.metrics import metrics
+from src.lifecycle import TRANSITION_ACTION_ID, IncidentNotFound, InvalidTransition, transition_incident
+from src.utils import post_message_to_slack
 
 router = APIRouter()
 
@@ -79,32 +84,16 @@ async def incident(
     trigger_id = form_data.get("trigger_id")
 
     if command == "/create-incident":
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {settings.SLACK_BOT_TOKEN}",
-        }
-        modal_view = await create_modal_view(callback_id="incident_form")
-        payload = {"trigger_id": trigger_id, "view": modal_view}
-        print(json.dumps(payload, indent=2))  # Log the payload for debugging
-        
-        try:
-            slack_response = requests.post(
-                "https://slack.com/api/views.open", headers=headers, json=payload
-            )
-            slack_response.raise_for_status()  # Raise an exception for HTTP errors
-            slack_response_data = slack_response.json()  # Parse JSON response
-        except requests.exceptions.RequestException as e:
-            raise HTTPException(
-                status_code=400, detail=f"Failed to open the form: {str(e)}"
-            )
-        except json.JSONDecodeError as e:
-            raise HTTPException(
-                status_code=400, detail=f"Failed to parse Slack response: {str(e)}"
-            )
+        payload = modal_view_cache.views_open_payload(
+            trigger_id=trigger_id, callback_id="incident_form"
+        )
+        print(f"Opening incident form for trigger_id {trigger_id}")
 
-        if not slack_response_data.get("ok"):
+        try:
+            await slack_client.views_open_payload(payload)
+        except SlackApiError as e:
             raise HTTPException(
-                status_code=400, detail=f"Slack API error: {slack_response_data}"
+                status_code=400, detail=f"Slack API error: {e.response}"
             )
 
         return JSONResponse(
@@ -118,13 +107,81 @@ async def incident(
         return JSONResponse(status_code=404, content={"detail": "Command not found"})
 
 
+# Select menus backed by the options registry. Slack calls this "options load URL"
+# with the text typed so far and shows the options we return.
+EXTERNAL_SELECT_CATEGORIES = {
+    "affected_products_action": "affected_products",
+    "suspected_owning_team_action": "suspected_owning_team",
+}
+
+
+@router.post("/slack/options")
+async def slack_options(
+    request: Request,
+    x_slack_signature: str = Header(None),
+    x_slack_request_timestamp: str = Header(None),
+):
+    await verify_slack_request(request, x_slack_signature, x_slack_request_timestamp)
+
+    try:
+        form_data = await request.form()
+        payload_data = json.loads(form_data.get("payload") or "")
+    except json.JSONDecodeError as e:
+        raise HTTPException(
+            status_code=400, detail=f"Failed to parse request body: {str(e)}"
+        )
+
+    if payload_data.get("token") != settings.SLACK_VERIFICATION_TOKEN:
+        raise HTTPException(status_code=400, detail="Invalid token")
+
+    category = EXTERNAL_SELECT_CATEGORIES.get(payload_data.get("action_id"))
+    if payload_data.get("type") != "block_suggestion" or category is None:
+        return JSONResponse(status_code=404, content={"detail": "Options not found"})
+
+    matches = options_index(options_registry.snapshot, category).search(
+        payload_data.get("value", "")
+    )
+    return {
+        "options": [
+            {"text": {"type": "plain_text", "text": item["text"]}, "value": item["value"]}
+            for item in matches
+        ]
+    }
+
+
+# Endpoint for the Slack Events API. Channel events keep the channel directory
+# cache in sync without listing every channel again.
+@router.post("/slack/events")
+async def slack_events(
+    request: Request,
+    x_slack_signature: str = Header(None),
+    x_slack_request_timestamp: str = Header(None),
+):
+    await verify_slack_request(request, x_slack_signature, x_slack_request_timestamp)
+
+    # Handle URL verification with slack
+    challenge = await slack_challenge_parameter_verification(request)
+    if challenge:
+        return challenge
+
+    body = await request.json()
+    if body.get("type") == "event_callback":
+        event = body.get("event", {})
+        if event.get("type", "").startswith("channel_"):
+            channel_directory.handle_event(event)
+
+    return Response(status_code=status.HTTP_200_OK)
+
+
 # Endpoint to handle interactivity when sending the post back to the server from slack
-@router.post("/slack/interactions", status_code=status.HTTP_201_CREATED)
+@router.post("/slack/interactions", status_code=status.HTTP_200_OK)
 async def slack_interactions(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     x_slack_signature: str = Header(None),
     x_slack_request_timestamp: str = Header(None),
+    x_slack_retry_num: str = Header(None),
+    x_slack_retry_reason: str = Header(None),
 ):
     # Verify Slack request
     await verify_slack_request(request, x_slack_signature, x_slack_request_timestamp)
@@ -152,6 +209,17 @@ async def slack_interactions(
     if payload_data.get("type") == "view_submission":
         callback_id = payload_data.get("view", {}).get("callback_id")
         if callback_id == "incident_form":
+            # Slack retries a submission it did not see acknowledged in time. A
+            # retry of a submission this worker already stored is answered
+            # without touching the database, the unique idempotency_key covers
+            # retries that land on another worker.
+            idempotency_key = slack_view_key(payload_data.get("view", {}))
+            if x_slack_retry_num:
+                print(f"Slack retry {x_slack_retry_num} ({x_slack_retry_reason}) of {idempotency_key}")
+            if idempotency_key is not None and submission_cache.get(idempotency_key) is not None:
+                metrics.increment("slack_duplicate_submissions")
+                return Response(status_code=status.HTTP_200_OK)
+
             try:
                 state_values = (
                     payload_data.get("view", {}).get("state", {}).get("values", {})
@@ -290,6 +358,25 @@ async def slack_interactions(
                     "Incident data:", json.dumps(incident_data, indent=4)
                 )  # Log the incident data for debugging
 
+                # external_select values are whatever the options endpoint offered,
+                # so check them against the options loaded now and show unknown
+                # ones as errors on their block in the modal
+                snapshot = options_registry.snapshot
+                submitted = {
+                    "affected_products": affected_products,
+                    "severity": [incident_data["severity"]] if incident_data["severity"] else [],
+                    "suspected_owning_team": suspected_owning_team,
+                    "suspected_affected_components": suspected_affected_components,
+                }
+                option_errors = {}
+                for category, values in submitted.items():
+                    unknown = [value for value in values if snapshot.lookup(category, value) is None]
+                    if unknown:
+                        option_errors[category] = f"Unknown option: {', '.join(unknown)}"[:150]
+                if option_errors:
+                    metrics.increment("slack_unknown_option_submissions")
+                    return JSONResponse(content={"response_action": "errors", "errors": option_errors})
+
                 try:
                     incident = schemas.IncidentCreate(**incident_data)
                     print(f"Incident data after parsing: {incident}")
@@ -311,72 +398,60 @@ async def slack_interactions(
                     status_code=400, detail=f"Failed to parse request body: {str(e)}"
                 )
 
-            # Time to save the incident to our postgresql database
-            db_incident = models.Incident(**incident.dict())
-            db.add(db_incident)
-            db.commit()
-            db.refresh(db_incident)
-
-            # Slack integration logic
-            try:
-                channel_name = f"incident-{db_incident.suspected_owning_team[0].replace(' ', '-').lower()}"
-                channel_id = await create_slack_channel(channel_name)
-
-                # Post a message to the new channel
-                incident_message = f"New Incident Created:\n\n*Description:* {db_incident.description}\n*Severity:* {db_incident.severity}\n*Affected Products:* {', '.join(db_incident.affected_products)}\n*Start Time:* {db_incident.start_time}\n*End Time:* {db_incident.end_time}\n*Customer Affected:* {'Yes' if db_incident.p1_customer_affected else 'No'}\n*Suspected Owning Team:* {', '.join(db_incident.suspected_owning_team)}"
-                await post_message_to_slack(channel_id, incident_message)
-
-                # Post a message to the general outages channel
-                general_outages_message = f"New Incident Created in #{channel_name}:\n\n*Description:* {db_incident.description}\n*Severity:* {db_incident.severity}\n*Affected Products:* {', '.join(db_incident.affected_products)}\n*Start Time:* {db_incident.start_time}\n*End Time:* {db_incident.end_time}\n*Customer Affected:* {'Yes' if db_incident.p1_customer_affected else 'No'}"
-                await post_message_to_slack(
-                    settings.SLACK_GENERAL_OUTAGES_CHANNEL, general_outages_message
-                )
-
-            except Exception as e:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
-                )
-
-            # return {"incident_id": db_incident.id}
-
-            # Add these debug print statements here
-            print(f"Incident data before Jira ticket creation:")
-            print(f"Affected Products: {db_incident.affected_products}")
-            print(f"Suspected Owning Team: {db_incident.suspected_owning_team}")
-
-            if db_incident.end_time is None:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND, detail="End time not found"
-                )
-
-            # Opsgenie integration
-            try:
-                await create_alert(db_incident)
-            except Exception as e:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
-                )
-
-            # Jira integration-the logic is not implemented yet
-            # try:
-            #     incident = db.query(Incident).filter(Incident.id == db_incident.id).first()
-            #     if not incident:
-            #         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Incident not found")
-            #     issue = create_jira_ticket(incident)
-            #     return {"issue_key": issue['key']}
-            #     # return {"issue_key": issue.key}
-            # except Exception as e:
-            #     raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
-            try:
-                issue = create_jira_ticket(db_incident)
-            except Exception as e:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
-                )
-            return {"incident_id": db_incident.id, "issue_key": issue["key"]}
+            # Time to save the incident to our postgresql database, together with a
+            # pending outbox entry for every integration we are about to call
+            db_incident = await insert_incident(db, incident, idempotency_key=idempotency_key)
+            if db_incident is None:
+                # Stored by an earlier delivery of the same submission
+                metrics.increment("slack_duplicate_submissions")
+                submission_cache.put(idempotency_key, await incident_id_for_key(db, idempotency_key))
+                return Response(status_code=status.HTTP_200_OK)
+            if idempotency_key is not None:
+                submission_cache.put(idempotency_key, db_incident.id)
+
+            # Slack closes the modal only if we answer within 3 seconds, so the
+            # Slack, Opsgenie and Jira calls are delivered from the outbox after
+            # the response, retried until they succeed. No need to wait for the
+            # next poll for this one.
+            outbox_dispatcher.wake()
+
+            # An empty 200 response acknowledges the view submission
+            return Response(status_code=status.HTTP_200_OK)
         else:
             return JSONResponse(
                 status_code=404, content={"detail": "Command or callback ID not found"}
             )
 
+    # Lifecycle buttons on the incident channel message
+    if payload_data.get("type") == "block_actions":
+        actions = [
+            action
+            for action in payload_data.get("actions", [])
+            if action.get("action_id", "").startswith(TRANSITION_ACTION_ID)
+        ]
+        if not actions:
+            return JSONResponse(status_code=404, content={"detail": "Action not found"})
+
+        incident_id, to_status = actions[0]["value"].split(":", 1)
+        user_id = payload_data.get("user", {}).get("id")
+        channel_id = payload_data.get("channel", {}).get("id")
+        try:
+            event = await transition_incident(
+                db, int(incident_id), to_status, actor=user_id, source="slack"
+            )
+        except (IncidentNotFound, InvalidTransition) as e:
+            if channel_id:
+                await post_message_to_slack(channel_id, f"Could not update incident {incident_id}: {e}")
+            return Response(status_code=status.HTTP_200_OK)
+        # The incident message itself, status and buttons, is edited in place
+        # by the slack_update outbox entry the transition queued
+        outbox_dispatcher.wake()
+
+        if channel_id:
+            await post_message_to_slack(
+                channel_id,
+                f"Incident {incident_id} moved from *{event.from_status}* to *{event.to_status}* by <@{user_id}>",
+            )
+        return Response(status_code=status.HTTP_200_OK)
+
     return JSONResponse(status_code=404, content={"detail": "Event type not found"})
@@ -0,0 +1,175 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import List, Literal, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from src import schemas
+from src.crud import ArrayMatch, list_incidents, search_incidents
+from src.database import get_async_db
+from src.export import MEDIA_TYPES, ExportFormat, export_incidents
+from src.bulk_import import import_incidents
+from src.stats import StatsDimension, get_weekly_stats
+from src.outbox import outbox_dispatcher
+from src.external_refs import find_refs, list_refs
+from src.lifecycle import IncidentNotFound, InvalidTransition, list_events, transition_incident
+from src.utils import verify_api_token
+
+router = APIRouter(prefix="/incidents", tags=["incidents"])
+
+
+# Read API over service_incidents. Results are ordered newest first and paginated
+# with an opaque cursor: pass the next_cursor of a page as cursor to get the next.
+# Repeated team/product/component values must all match, or any of them with match=any.
+# unresolved=true lists open incidents from the partial index on unresolved incidents.
+# Requires the incidents API token as a Bearer token.
+@router.get("", response_model=schemas.IncidentPage, dependencies=[Depends(verify_api_token)])
+async def get_incidents(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    team: Optional[List[str]] = Query(None),
+    product: Optional[List[str]] = Query(None),
+    component: Optional[List[str]] = Query(None),
+    match: ArrayMatch = "all",
+    unresolved: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        incidents, next_cursor = await list_incidents(
+            db,
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            severity=severity,
+            teams=team,
+            products=product,
+            components=component,
+            match=match,
+            unresolved=unresolved,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": incidents, "next_cursor": next_cursor}
+
+
+# Full-text search over description, message for SP, products and teams, so
+# responders can find prior similar incidents. Ranked by relevance, not paginated.
+# Requires the incidents API token as a Bearer token.
+@router.get(
+    "/search",
+    response_model=List[schemas.IncidentSearchResult],
+    dependencies=[Depends(verify_api_token)],
+)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    results = await search_incidents(db, q, limit=limit)
+    return [
+        schemas.IncidentSearchResult(
+            **schemas.IncidentResponse.model_validate(incident).model_dump(), rank=rank
+        )
+        for incident, rank in results
+    ]
+
+
+# Bulk export for postmortems and SLA reports. Streams every matching incident
+# from a server-side cursor instead of building the whole response in memory.
+# Requires the incidents API token as a Bearer token.
+@router.get("/export", dependencies=[Depends(verify_api_token)])
+async def export(
+    format: ExportFormat = "ndjson",
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    team: Optional[List[str]] = Query(None),
+    product: Optional[List[str]] = Query(None),
+    component: Optional[List[str]] = Query(None),
+    match: ArrayMatch = "all",
+):
+    rows = export_incidents(
+        format,
+        since=since,
+        until=until,
+        status=status,
+        severity=severity,
+        teams=team,
+        products=product,
+        components=component,
+        match=match,
+    )
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="incidents.{format}"'},
+    )
+
+
+# Bulk import of historical incidents. The body is NDJSON, one IncidentImport
+# per line, read as it arrives and loaded with COPY. Answers with the number of
+# imported/rejected rows, the first errors by line number and the throughput.
+# Requires the incidents API token as a Bearer token.
+@router.post("/import", dependencies=[Depends(verify_api_token)])
+async def bulk_import(request: Request, batch_size: int = Query(1000, ge=1, le=50000)):
+    return await import_incidents(request.stream(), batch_size=batch_size)
+
+
+# Weekly incident counts, P1 customer impact rate and MTTR per team, product or
+# severity (or overall), answered from the incident_weekly_stats rollup.
+@router.get("/stats", response_model=List[schemas.IncidentStats])
+async def stats(
+    dimension: StatsDimension = "all",
+    value: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await get_weekly_stats(db, dimension=dimension, value=value, since=since, until=until)
+
+
+# Lifecycle: open -> investigating -> mitigated -> resolved. Every transition is
+# appended to incident_events; the Slack buttons go through the same function.
+# Requires the incidents API token as a Bearer token.
+@router.post(
+    "/{incident_id}/transitions",
+    response_model=schemas.IncidentEventResponse,
+    dependencies=[Depends(verify_api_token)],
+)
+async def transition(
+    incident_id: int,
+    body: schemas.IncidentTransition,
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        event = await transition_incident(db, incident_id, body.status, actor=body.actor)
+    except IncidentNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidTransition as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    # Queued with the transition: Slack message update, closing the Opsgenie alert on resolve
+    outbox_dispatcher.wake()
+    return event
+
+
+@router.get("/{incident_id}/events", response_model=List[schemas.IncidentEventResponse])
+async def events(incident_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await list_events(db, incident_id)
+
+
+# Where an incident lives in Jira, Opsgenie and Slack, recorded as the deliveries
+# succeed. /refs goes the other way: the incident of a Jira key, alert or channel.
+@router.get("/refs", response_model=List[schemas.IncidentExternalRefResponse])
+async def find_external_refs(
+    system: Literal["jira", "opsgenie", "slack"],
+    external_id: str = Query(..., min_length=1, max_length=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await find_refs(db, system, external_id)
+
+
+@router.get("/{incident_id}/refs", response_model=List[schemas.IncidentExternalRefResponse])
+async def external_refs(incident_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await list_refs(db, incident_id)
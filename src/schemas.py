@@ -1,19 +1,26 @@
-from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional,List
+from pydantic import BaseModel, Field, field_validator
+from datetime import datetime, timezone
+from typing import Literal,Optional,List
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps with an offset as naive UTC, the columns are timestamp without time zone."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 class IncidentBase(BaseModel):
     """Base model for incident."""
 
     affected_products: List[str]
-    severity: str
+    severity: str = Field(..., max_length=50)
     suspected_owning_team: List[str]
     start_time: datetime
     end_time: datetime
     p1_customer_affected: bool
     suspected_affected_components: List[str]
-    description: str
+    description: str = Field(..., max_length=250)
     message_for_sp: Optional[str] = Field(None, min_length=0, max_length=250)
     statuspage_notification: bool = Field(False)
     separate_channel_creation: bool = Field(False)
@@ -23,13 +30,82 @@ class IncidentCreate(IncidentBase):
     pass
 
 
+class IncidentImport(IncidentCreate):
+    """Model for an incident loaded from the old tracker, keeps its history."""
+    status: Optional[Literal["open", "investigating", "mitigated", "resolved"]] = None
+    created_at: Optional[datetime] = None
+
+    # Exports of other trackers usually carry offsets, which COPY cannot encode
+    @field_validator("start_time", "end_time", "created_at")
+    @classmethod
+    def store_as_naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        return naive_utc(value)
+
+
 class IncidentResponse(IncidentBase):
     """Response model for incident."""
     id: int
+    status: Optional[str] = None
     created_at: datetime
 
     class Config:
-        orm_mode = True
-        
+        from_attributes = True
+
+
+class IncidentPage(BaseModel):
+    """One page of incidents; pass next_cursor back as cursor to get the next one."""
+    items: List[IncidentResponse]
+    next_cursor: Optional[str] = None
+
+
+class IncidentSearchResult(IncidentResponse):
+    """Incident matching a full-text search, with its relevance."""
+    rank: float
+
+
+class IncidentStats(BaseModel):
+    """Weekly incident statistics for one value of a dimension (team, product...)."""
+    week: datetime
+    dimension: str
+    value: str
+    incident_count: int
+    p1_customer_affected_count: int
+    p1_customer_impact_rate: float
+    mttr_seconds: float
+
+
+class IncidentTransition(BaseModel):
+    """Request to move an incident to another lifecycle status."""
+    status: Literal["open", "investigating", "mitigated", "resolved"]
+    actor: Optional[str] = Field(None, max_length=100)
+
+
+class IncidentEventResponse(BaseModel):
+    """One status transition of an incident."""
+    id: int
+    incident_id: int
+    from_status: Optional[str] = None
+    to_status: str
+    actor: Optional[str] = None
+    source: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class IncidentOut(BaseModel):
     Incident: IncidentResponse
+
+
+class IncidentExternalRefResponse(BaseModel):
+    """An incident's Jira issue, Opsgenie alert or Slack channel/message."""
+    incident_id: int
+    system: str
+    kind: str
+    external_id: str
+    parent_id: Optional[str] = None
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,111 @@
+"""Block Kit messages posted for an incident.
+
+Both messages (the incident channel one with the lifecycle buttons and the
+one in SLACK_GENERAL_OUTAGES_CHANNEL) are built from the same rendered
+sections. Sections are cached per incident revision: the details only change
+with the incident's fields, the status line and buttons only with its status,
+so a transition re-renders just those two before the messages are edited in
+place with chat.update.
+"""
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Tuple
+from src import models
+from src.lifecycle import RESOLVED, transition_actions_block
+
+STATUS_EMOJI = {
+    "open": ":red_circle:",
+    "investigating": ":large_orange_circle:",
+    "mitigated": ":large_yellow_circle:",
+    "resolved": ":large_green_circle:",
+}
+
+
+def content_revision(incident: models.Incident) -> Hashable:
+    """Changes whenever a field shown in the details section changes."""
+    return (
+        incident.description,
+        incident.severity,
+        tuple(incident.affected_products),
+        tuple(incident.suspected_owning_team),
+        incident.start_time,
+        incident.end_time,
+        incident.p1_customer_affected,
+    )
+
+
+def _details_blocks(incident: models.Incident) -> List[dict]:
+    return [
+        {
+            "type": "header",
+            "text": {"type": "plain_text", "text": f"Incident {incident.id}: {incident.severity}"[:150]},
+        },
+        {"type": "section", "text": {"type": "mrkdwn", "text": f"*Description:* {incident.description}"}},
+        {
+            "type": "section",
+            "fields": [
+                {"type": "mrkdwn", "text": f"*Severity:*\n{incident.severity}"},
+                {"type": "mrkdwn", "text": f"*Customer Affected:*\n{'Yes' if incident.p1_customer_affected else 'No'}"},
+                {"type": "mrkdwn", "text": f"*Affected Products:*\n{', '.join(incident.affected_products)}"},
+                {"type": "mrkdwn", "text": f"*Suspected Owning Team:*\n{', '.join(incident.suspected_owning_team)}"},
+                {"type": "mrkdwn", "text": f"*Start Time:*\n{incident.start_time}"},
+                {"type": "mrkdwn", "text": f"*End Time:*\n{incident.end_time}"},
+            ],
+        },
+    ]
+
+
+def _status_block(status: str) -> dict:
+    return {
+        "type": "context",
+        "elements": [{"type": "mrkdwn", "text": f"{STATUS_EMOJI.get(status, '')} *Status:* {status}"}],
+    }
+
+
+class MessageRenderer:
+    """Renders incident messages, caching each section by what it depends on."""
+
+    def __init__(self, maxsize: int = 1024):
+        self._maxsize = maxsize
+        self._sections: "OrderedDict[Hashable, object]" = OrderedDict()
+
+    def _section(self, key: Hashable, render: Callable):
+        section = self._sections.get(key)
+        if section is None:
+            section = self._sections[key] = render()
+            if len(self._sections) > self._maxsize:
+                self._sections.popitem(last=False)
+        else:
+            self._sections.move_to_end(key)
+        return section
+
+    def _common(self, incident: models.Incident) -> Tuple[List[dict], dict]:
+        details = self._section(
+            (incident.id, "details", content_revision(incident)), lambda: _details_blocks(incident)
+        )
+        status = self._section((incident.id, "status", incident.status), lambda: _status_block(incident.status))
+        return details, status
+
+    def incident_channel_message(self, incident: models.Incident) -> Tuple[str, List[dict]]:
+        """(fallback text, blocks) of the message in the incident's own channel."""
+        details, status = self._common(incident)
+        blocks = [*details, status]
+        if incident.status != RESOLVED:
+            blocks.append(
+                self._section(
+                    (incident.id, "actions", incident.status),
+                    lambda: transition_actions_block(incident.id, incident.status),
+                )
+            )
+        return f"Incident {incident.id} ({incident.status}): {incident.description}", blocks
+
+    def outages_message(self, incident: models.Incident, channel_id: str) -> Tuple[str, List[dict]]:
+        """(fallback text, blocks) of the message in SLACK_GENERAL_OUTAGES_CHANNEL."""
+        details, status = self._common(incident)
+        channel = {
+            "type": "context",
+            "elements": [{"type": "mrkdwn", "text": f"Follow the incident in <#{channel_id}>"}],
+        }
+        return f"Incident {incident.id} ({incident.status}) in <#{channel_id}>: {incident.description}", [*details, status, channel]
+
+
+message_renderer = MessageRenderer()
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import List, Literal, Optional
+from sqlalchemy import BigInteger, Column, DateTime, MetaData, Numeric, String, Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.config import settings
+from src.database import AsyncSessionLocal
+from src.metrics import metrics
+from src.schemas import naive_utc
+
+StatsDimension = Literal["all", "severity", "team", "product"]
+
+# The materialized view is created by migration a91c5e3f7d02. It lives in its own
+# MetaData so that create_all and Alembic autogenerate leave it alone.
+view_metadata = MetaData()
+
+incident_weekly_stats = Table(
+    "incident_weekly_stats",
+    view_metadata,
+    Column("week", DateTime),
+    Column("dimension", String),
+    Column("dimension_value", String),
+    Column("incident_count", BigInteger),
+    Column("p1_customer_affected_count", BigInteger),
+    Column("total_resolution_seconds", Numeric),
+)
+
+# Any constant works, it only has to be the same in every worker
+REFRESH_LOCK_ID = 72_211_016
+
+
+async def get_weekly_stats(
+    db: AsyncSession,
+    dimension: StatsDimension = "all",
+    value: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[dict]:
+    """Weekly counts, P1 customer impact rate and MTTR from the rollup.
+
+    Reads only the precomputed rows of incident_weekly_stats through its
+    (dimension, dimension_value, week) index, never service_incidents.
+    """
+    stats = incident_weekly_stats.c
+    query = select(incident_weekly_stats).where(stats.dimension == dimension)
+    if value is not None:
+        query = query.where(stats.dimension_value == value)
+    # week is naive, an aware bound cannot be compared with it
+    since, until = naive_utc(since), naive_utc(until)
+    if since is not None:
+        # Include the week `since` falls in, weeks start on Monday like date_trunc('week')
+        week_start = (since - timedelta(days=since.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        query = query.where(stats.week >= week_start)
+    if until is not None:
+        query = query.where(stats.week < until)
+    query = query.order_by(stats.week.desc(), stats.incident_count.desc())
+
+    rows = (await db.execute(query)).mappings()
+    return [
+        {
+            "week": row["week"],
+            "dimension": row["dimension"],
+            "value": row["dimension_value"],
+            "incident_count": row["incident_count"],
+            "p1_customer_affected_count": row["p1_customer_affected_count"],
+            "p1_customer_impact_rate": row["p1_customer_affected_count"] / row["incident_count"],
+            "mttr_seconds": float(row["total_resolution_seconds"] or 0) / row["incident_count"],
+        }
+        for row in rows
+    ]
+
+
+class StatsRefresher:
+    """Keeps incident_weekly_stats current in the background.
+
+    Writers call mark_dirty(); the view is refreshed at most once per interval
+    and only when something changed. REFRESH ... CONCURRENTLY keeps the view
+    readable while it rebuilds, and an advisory lock makes workers that wake up
+    at the same time skip instead of queueing identical refreshes.
+    """
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._dirty = True
+        self._task: Optional[asyncio.Task] = None
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    async def refresh(self) -> bool:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            locked = await db.scalar(select(func.pg_try_advisory_xact_lock(REFRESH_LOCK_ID)))
+            if not locked:
+                return False
+            await db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY incident_weekly_stats"))
+            await db.commit()
+        metrics.observe("incident_stats_refresh_seconds", time.perf_counter() - started)
+        return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self._interval)
+            if not self._dirty:
+                continue
+            self._dirty = False
+            try:
+                # Another worker holds the lock, but its refresh may have started
+                # before our writes committed: try again next interval
+                if not await self.refresh():
+                    self._dirty = True
+            except Exception as e:
+                self._dirty = True
+                print(f"Error refreshing incident stats: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+stats_refresher = StatsRefresher(settings.stats_refresh_interval_seconds)
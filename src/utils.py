@@ -1,14 +1,18 @@
-from fastapi import Request, HTTPException
+from fastapi import Request, HTTPException, Header
 from .config import settings
+import asyncio
 import hmac
 import hashlib
-import json
-import os
 import time
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
+import orjson
+from typing import Awaitable, Callable, Optional
+from src.helperFunctions.errors import PermanentDeliveryError
+from src.helperFunctions.slack import PERMANENT_ERRORS, slack_client, SlackApiError
+from src.helperFunctions.slack_channels import channel_directory
 from fastapi import HTTPException, status
 from src.config import settings
+from src.metrics import metrics
+from src.options_registry import OptionsRegistry, OptionsSnapshot, options_registry
 
 
 async def verify_slack_request(
@@ -32,6 +36,15 @@ async def verify_slack_request(
         raise HTTPException(status_code=400, detail="Invalid request signature")
 
 
+async def verify_api_token(authorization: str = Header(None)):
+    # Write endpoints of the incidents API, called by scripts rather than Slack
+    if not settings.incidents_api_token:
+        raise HTTPException(status_code=401, detail="API token not configured")
+    expected = f"Bearer {settings.incidents_api_token}"
+    if authorization is None or not hmac.compare_digest(expected.encode(), authorization.encode()):
+        raise HTTPException(status_code=401, detail="Invalid API token")
+
+
 async def slack_challenge_parameter_verification(request: Request):
     try:
         body = await request.json()
@@ -44,19 +57,10 @@ async def slack_challenge_parameter_verification(request: Request):
         return {"challenge": body.get("challenge")}
 
 
-async def load_options_from_file(file_path: str) -> dict:
-    assert os.path.exists(file_path), f"File {file_path} does not exist."
-    with open(file_path, "r") as f:
-        return json.load(f)
-
-
-options = load_options_from_file("src/options.json")
-
-
-async def create_modal_view(callback_id: str) -> dict:
+def build_modal_view(options: OptionsSnapshot, callback_id: str) -> dict:
     return {
         "type": "modal",
-        "callback_id": "incident_form",
+        "callback_id": callback_id,
         "title": {"type": "plain_text", "text": "Report Incident"},
         "submit": {"type": "plain_text", "text": "Submit"},
         "close": {"type": "plain_text", "text": "Cancel"},
@@ -74,15 +78,10 @@ async def create_modal_view(callback_id: str) -> dict:
                 "block_id": "affected_products",
                 "label": {"type": "plain_text", "text": "Affected Products"},
                 "element": {
-                    "type": "multi_static_select",
+                    # Options are served per keystroke by the /slack/options endpoint
+                    "type": "multi_external_select",
                     "placeholder": {"type": "plain_text", "text": "Select products"},
-                    "options": [
-                        {
-                            "text": {"type": "plain_text", "text": item["text"]},
-                            "value": item["value"],
-                        }
-                        for item in options["affected_products"]
-                    ],
+                    "min_query_length": 0,
                     "action_id": "affected_products_action",
                 },
             },
@@ -108,15 +107,10 @@ async def create_modal_view(callback_id: str) -> dict:
                 "block_id": "suspected_owning_team",
                 "label": {"type": "plain_text", "text": "Suspected Owning Team"},
                 "element": {
-                    "type": "multi_static_select",
+                    # Options are served per keystroke by the /slack/options endpoint
+                    "type": "multi_external_select",
                     "placeholder": {"type": "plain_text", "text": "Select teams"},
-                    "options": [
-                        {
-                            "text": {"type": "plain_text", "text": item["text"]},
-                            "value": item["value"],
-                        }
-                        for item in options["suspected_owning_team"]
-                    ],
+                    "min_query_length": 0,
                     "action_id": "suspected_owning_team_action",
                 },
             },
@@ -250,39 +244,141 @@ async def create_modal_view(callback_id: str) -> dict:
     }
 
 
-# slack channel creation logic
-slack_client = WebClient(token=settings.SLACK_BOT_TOKEN)
+class ModalViewCache:
+    """Pre-serialized incident modal, rebuilt only when the options change.
+
+    The view is rendered and encoded with orjson once per options registry
+    version, so opening the modal only splices the trigger_id into cached
+    bytes instead of rebuilding and re-encoding the Block Kit dict.
+    """
+
+    def __init__(self, registry: OptionsRegistry):
+        self._registry = registry
+        self._version = None
+        self._views = {}
+
+    def view_bytes(self, callback_id: str) -> bytes:
+        snapshot = self._registry.snapshot
+        if snapshot.version != self._version:
+            self._views = {}
+            self._version = snapshot.version
+        view = self._views.get(callback_id)
+        if view is None:
+            view = orjson.dumps(build_modal_view(snapshot, callback_id))
+            self._views[callback_id] = view
+            print(f"Modal view {callback_id} rendered ({len(view)} bytes)")
+        return view
+
+    def views_open_payload(self, trigger_id: str, callback_id: str) -> bytes:
+        return (
+            b'{"trigger_id":'
+            + orjson.dumps(trigger_id)
+            + b',"view":'
+            + self.view_bytes(callback_id)
+            + b"}"
+        )
+
+
+modal_view_cache = ModalViewCache(options_registry)
 
 
+class PermanentSlackError(PermanentDeliveryError, HTTPException):
+    """A Slack error in PERMANENT_ERRORS, the outbox does not retry it."""
+
+
+def slack_http_error(e: SlackApiError) -> HTTPException:
+    error = e.response.get("error")
+    print(f"Slack API error: {error}")
+    error_class = PermanentSlackError if error in PERMANENT_ERRORS else HTTPException
+    return error_class(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"Slack API error: {error}",
+    )
+
+
+# slack channel creation logic
 async def get_channel_id(channel_name: str, retries: int = 3) -> str:
     try:
-        response = slack_client.conversations_list()
-        for channel in response["channels"]:
-            if channel["name"] == channel_name:
-                print(f"Channel already exists. Channel ID: {channel['id']}")
-                return channel["id"]
-        return None
+        channel_id = await channel_directory.get(channel_name)
+        if channel_id:
+            print(f"Channel already exists. Channel ID: {channel_id}")
+        return channel_id
     except SlackApiError as e:
-        print(f"Slack API error: {e.response['error']}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Slack API error: {e.response['error']}",
-        )
+        raise slack_http_error(e)
 
 
-async def post_message_to_slack(channel_id: str, message: str):
+async def post_message_to_slack(channel_id: str, message: str, blocks: list = None):
     try:
-        slack_client.chat_postMessage(channel=channel_id, text=message)
+        if blocks:
+            # text stays as the notification/fallback text of a Block Kit message
+            response = await slack_client.chat_postMessage(channel=channel_id, text=message, blocks=blocks)
+        else:
+            response = await slack_client.chat_postMessage(channel=channel_id, text=message)
         print(f"Message posted to Slack channel ID {channel_id}")
+        # The message ts, what chat.update and threads address it by
+        return response.get("ts")
     except SlackApiError as e:
-        print(f"Slack API error: {e.response['error']}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Slack API error: {e.response['error']}",
-        )
+        raise slack_http_error(e)
+
+
+async def update_slack_message(channel_id: str, ts: str, message: str, blocks: list = None):
+    try:
+        await slack_client.chat_update(channel=channel_id, ts=ts, text=message, blocks=blocks or [])
+        print(f"Message {ts} updated in Slack channel ID {channel_id}")
+    except SlackApiError as e:
+        raise slack_http_error(e)
+
+
+async def wait_for_channel_ready(
+    channel_id: str,
+    timeout: float = settings.slack_channel_ready_timeout_seconds,
+    initial_delay: float = 0.1,
+    max_delay: float = 1.0,
+) -> float:
+    """Poll conversations.info until a freshly created channel is visible.
+
+    Backs off exponentially between polls and gives up after `timeout` seconds.
+    Returns the measured readiness latency, which is also recorded in the
+    slack_channel_ready_seconds metric.
+    """
+    started = time.monotonic()
+    delay = initial_delay
+    while True:
+        try:
+            await slack_client.conversations_info(channel=channel_id)
+            latency = time.monotonic() - started
+            metrics.observe("slack_channel_ready_seconds", latency)
+            print(f"Channel {channel_id} ready after {latency:.3f}s")
+            return latency
+        except SlackApiError as e:
+            if e.response.get("error") != "channel_not_found":
+                raise
+
+        if time.monotonic() - started + delay > timeout:
+            metrics.increment("slack_channel_ready_timeouts")
+            raise SlackApiError(
+                "conversations.info", {"ok": False, "error": "channel_not_ready"}
+            )
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
 
 
-async def create_slack_channel(channel_name: str) -> str:
+async def wait_for_slack_channel(channel_id: str):
+    try:
+        await wait_for_channel_ready(channel_id)
+    except SlackApiError as e:
+        raise slack_http_error(e)
+
+
+async def create_slack_channel(
+    channel_name: str, on_created: Optional[Callable[[str], Awaitable]] = None
+) -> str:
+    """Create a channel named after `channel_name` and wait until it can be posted to.
+
+    `on_created` is awaited with the channel ID as soon as Slack has created the
+    channel, before the readiness wait, so a caller can record the channel even
+    if the wait times out.
+    """
     try:
         # Check if channel already exists
         channel_id = await get_channel_id(channel_name)
@@ -292,19 +388,18 @@ async def create_slack_channel(channel_name: str) -> str:
 
         # If the channel does not exist, create a new one
         unique_channel_name = f"{channel_name}-{int(time.time())}"
-        response = slack_client.conversations_create(
+        response = await slack_client.conversations_create(
             name=unique_channel_name, is_private=False
         )
         channel_id = response["channel"]["id"]
+        channel_directory.add(unique_channel_name, channel_id)
         print(f"Channel created successfully. Channel ID: {channel_id}")
+        if on_created is not None:
+            await on_created(channel_id)
 
-        # Adding a minor delay to make sure that Slack API recognizes the new channel
-        time.sleep(3)
+        # Make sure that Slack API recognizes the new channel before we post to it
+        await wait_for_channel_ready(channel_id)
         return channel_id
 
     except SlackApiError as e:
-        print(f"Slack API error: {e.response['error']}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Slack API error: {e.response['error']}",
-        )
+        raise slack_http_error(e)
@@ -0,0 +1,24 @@
+import os
+
+# src.config reads these from .env, placeholders let the unit tests import the
+# modules without one. Nothing here talks to Slack, Opsgenie, Jira or Postgres.
+for name in (
+    "SLACK_SIGNING_SECRET",
+    "NGROK_AUTHTOKEN",
+    "SLACK_BOT_TOKEN",
+    "SLACK_VERIFICATION_TOKEN",
+    "SLACK_GENERAL_OUTAGES_CHANNEL",
+    "database_hostname",
+    "database_password",
+    "database_name",
+    "database_username",
+    "secret_key",
+    "algorithm",
+    "opsgenie_api_key",
+    "jira_api_key",
+    "jira_email",
+    "jira_server",
+):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("database_port", "5432")
+os.environ.setdefault("access_token_expire_minutes", "30")
@@ -0,0 +1,20 @@
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from src.crud import decode_cursor, encode_cursor
+
+
+class CursorTest(unittest.TestCase):
+    def test_round_trip(self):
+        incident = SimpleNamespace(created_at=datetime(2024, 7, 30, 14, 5, 52, 718240), id=1234)
+        self.assertEqual(decode_cursor(encode_cursor(incident)), (incident.created_at, 1234))
+
+    def test_invalid_cursors_raise_value_error(self):
+        # The listing endpoint turns ValueError into a 400
+        for cursor in ("", "not-base64!", "W10=", "WyJub3QgYSBkYXRlIiwgMV0="):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from src.helperFunctions.jira import bulk_results
+
+
+class BulkResultsTest(unittest.TestCase):
+    def test_all_created_in_request_order(self):
+        response = {"issues": [{"key": "SO-1"}, {"key": "SO-2"}, {"key": "SO-3"}], "errors": []}
+        self.assertEqual(
+            bulk_results(3, response),
+            [({"key": "SO-1"}, None), ({"key": "SO-2"}, None), ({"key": "SO-3"}, None)],
+        )
+
+    def test_issues_skip_failed_elements(self):
+        error = {"failedElementNumber": 1, "status": 400, "elementErrors": {"errors": {"summary": "required"}}}
+        response = {"issues": [{"key": "SO-1"}, {"key": "SO-2"}], "errors": [error]}
+        self.assertEqual(
+            bulk_results(3, response),
+            [({"key": "SO-1"}, None), (None, error), ({"key": "SO-2"}, None)],
+        )
+
+    def test_failures_at_both_ends(self):
+        first, last = {"failedElementNumber": 0}, {"failedElementNumber": 3}
+        response = {"issues": [{"key": "SO-7"}, {"key": "SO-8"}], "errors": [last, first]}
+        self.assertEqual(
+            bulk_results(4, response),
+            [(None, first), ({"key": "SO-7"}, None), ({"key": "SO-8"}, None), (None, last)],
+        )
+
+    def test_missing_issues_come_back_as_neither(self):
+        # A truncated response must not shift the issues onto other incidents
+        self.assertEqual(bulk_results(2, {"issues": [{"key": "SO-1"}]}), [({"key": "SO-1"}, None), (None, None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
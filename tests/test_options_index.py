@@ -0,0 +1,41 @@
+import unittest
+from src.options_index import OptionsIndex
+
+ITEMS = [
+    {"text": "Payments API", "value": "payments-api"},
+    {"text": "Card Payments", "value": "card-payments"},
+    {"text": "Checkout", "value": "checkout"},
+    {"text": "Search", "value": "search"},
+    {"text": "API Gateway", "value": "api-gateway"},
+]
+
+
+def values(results):
+    return [item["value"] for item in results]
+
+
+class OptionsIndexSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.index = OptionsIndex(ITEMS)
+
+    def test_empty_query_lists_the_first_options(self):
+        self.assertEqual(values(self.index.search("  ", limit=2)), ["payments-api", "card-payments"])
+
+    def test_short_query_matches_word_prefixes(self):
+        self.assertEqual(values(self.index.search("ap")), ["api-gateway", "payments-api"])
+        self.assertEqual(values(self.index.search("Ch")), ["checkout"])
+
+    def test_substring_query_ranks_prefix_then_word_then_substring(self):
+        self.assertEqual(values(self.index.search("payments")), ["payments-api", "card-payments"])
+        self.assertEqual(values(self.index.search("ayment")), ["card-payments", "payments-api"])
+
+    def test_trigram_candidates_are_confirmed_as_substrings(self):
+        # "api" and "pay" both occur, but not as "api pay"
+        self.assertEqual(values(self.index.search("api pay")), [])
+
+    def test_limit(self):
+        self.assertEqual(len(self.index.search("a", limit=1)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+from unittest import mock
+from sqlalchemy.dialects import postgresql
+from src import outbox
+from src.config import settings
+from src.helperFunctions.jira_fields import InvalidFieldValue
+
+
+class FakeResult:
+    def __init__(self, rowcount: int):
+        self.rowcount = rowcount
+
+
+class FakeSession:
+    """Records the statements record_outcome executes, rowcounts in order."""
+
+    def __init__(self, rowcounts):
+        self.rowcounts = list(rowcounts)
+        self.statements = []
+        self.committed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.rowcounts.pop(0))
+
+    async def commit(self):
+        self.committed = True
+
+
+def compiled(statement):
+    return statement.compile(dialect=postgresql.dialect())
+
+
+class BackoffSecondsTest(unittest.TestCase):
+    def test_doubles_per_attempt_with_upper_half_jittered(self):
+        with mock.patch.object(settings, "outbox_backoff_base_seconds", 5.0), mock.patch.object(
+            settings, "outbox_backoff_max_seconds", 900.0
+        ):
+            for attempts, delay in ((1, 5.0), (2, 10.0), (3, 20.0), (5, 80.0)):
+                with mock.patch.object(outbox.random, "uniform", side_effect=lambda low, high: low):
+                    self.assertEqual(outbox.backoff_seconds(attempts), delay / 2)
+                with mock.patch.object(outbox.random, "uniform", side_effect=lambda low, high: high):
+                    self.assertEqual(outbox.backoff_seconds(attempts), delay)
+
+    def test_capped_at_max(self):
+        with mock.patch.object(settings, "outbox_backoff_base_seconds", 5.0), mock.patch.object(
+            settings, "outbox_backoff_max_seconds", 60.0
+        ):
+            for _ in range(100):
+                self.assertTrue(30.0 <= outbox.backoff_seconds(20) <= 60.0)
+
+
+class RecordOutcomeTest(unittest.IsolatedAsyncioTestCase):
+    async def record(self, rowcounts, attempts, error, detail="detail"):
+        session = FakeSession(rowcounts)
+        with mock.patch.object(outbox, "AsyncSessionLocal", lambda: session), mock.patch.object(
+            settings, "outbox_max_attempts", 3
+        ):
+            status = await outbox.record_outcome(42, "token", attempts, error, detail)
+        self.assertTrue(session.committed)
+        return status, session.statements
+
+    async def test_success_is_recorded_for_the_owning_claim(self):
+        status, statements = await self.record([1], 1, None)
+        self.assertEqual(status, "succeeded")
+        self.assertEqual(len(statements), 1)
+        update = compiled(statements[0])
+        self.assertIn("claim_token = ", str(update))
+        self.assertEqual(update.params["claim_token_1"], "token")
+        self.assertEqual(update.params["status"], "succeeded")
+
+    async def test_failure_below_max_attempts_is_retried(self):
+        status, statements = await self.record([1], 2, RuntimeError("Slack down"))
+        self.assertEqual(status, "pending")
+        self.assertNotIn("status", compiled(statements[0]).params)
+
+    async def test_failure_at_max_attempts_gives_up(self):
+        status, statements = await self.record([1], 3, RuntimeError("Slack down"))
+        self.assertEqual(status, "failed")
+        self.assertEqual(compiled(statements[0]).params["status"], "failed")
+
+    async def test_permanent_error_fails_on_first_attempt(self):
+        error = InvalidFieldValue("severity values ['Huge'] are not options")
+        status, statements = await self.record([1], 1, error, detail=outbox.error_detail(error))
+        self.assertEqual(status, "failed")
+        params = compiled(statements[0]).params
+        self.assertEqual(params["status"], "failed")
+        self.assertIn("Huge", params["detail"])
+
+    async def test_stale_claim_is_dropped_and_requeued_entry_made_due(self):
+        status, statements = await self.record([0, 1], 1, None)
+        self.assertIsNone(status)
+        self.assertEqual(len(statements), 2)
+        # Only an entry requeued since (pending, claim cleared) is released,
+        # never one another worker has claimed in the meantime
+        release = str(compiled(statements[1]))
+        self.assertIn("status = ", release)
+        self.assertIn("claim_token IS NULL", release)
+        self.assertEqual(outbox.OUTCOME_COUNTERS[status], "outbox_stale_outcomes")
+
+
+if __name__ == "__main__":
+    unittest.main()